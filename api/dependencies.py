@@ -0,0 +1,37 @@
+"""
+Dépendances FastAPI
+===================
+
+Accès aux instances de services initialisées au démarrage de l'application.
+"""
+
+from typing import Annotated
+
+from fastapi import Depends, Request
+
+from core.ai_engine import CyberSecAI
+from communication.interface import CommunicationInterface
+from security.threat_analyzer import ThreatAnalyzer
+
+
+# Les instances sont attachées à app.state par le lifespan de l'application,
+# qui interrompt le démarrage si l'une d'elles ne peut pas être initialisée.
+def get_ai_engine(request: Request) -> CyberSecAI:
+    """Dépendance pour obtenir le moteur IA"""
+    return request.app.state.ai_engine
+
+
+def get_comm_interface(request: Request) -> CommunicationInterface:
+    """Dépendance pour obtenir l'interface de communication"""
+    return request.app.state.comm_interface
+
+
+def get_threat_analyzer(request: Request) -> ThreatAnalyzer:
+    """Dépendance pour obtenir l'analyseur de menaces"""
+    return request.app.state.threat_analyzer
+
+
+# Alias des dépendances pour les signatures des routes
+AIEngineDep = Annotated[CyberSecAI, Depends(get_ai_engine)]
+CommInterfaceDep = Annotated[CommunicationInterface, Depends(get_comm_interface)]
+ThreatAnalyzerDep = Annotated[ThreatAnalyzer, Depends(get_threat_analyzer)]
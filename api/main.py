@@ -6,23 +6,33 @@ API REST pour CyberSec AI Assistant avec interface WebSocket et REST.
 """
 
 import asyncio
-import uvicorn
+import gzip
+import sys
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Dict, Any
-from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect, BackgroundTasks
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, Set
+from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from loguru import logger
-import json
+import orjson
 from datetime import datetime
 
+# Trames WebSocket binaires MessagePack optionnelles (JSON texte sinon)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 from core.ai_engine import CyberSecAI
 from core.config import config
 from communication.interface import CommunicationInterface, CommunicationMode, UrgencyLevel
 from security.threat_analyzer import ThreatAnalyzer
-from .routes import router
+from .routes import router, value_error_handler, general_exception_handler, clear_mitre_technique_cache
 from .models import *
 
 
@@ -30,7 +40,11 @@ from .models import *
 ai_engine = None
 comm_interface = None
 threat_analyzer = None
-websocket_connections: Dict[str, WebSocket] = {}
+# Connexions WebSocket, de la moins à la plus récemment active
+websocket_connections: "OrderedDict[str, WebSocket]" = OrderedDict()
+msgpack_sessions: Set[str] = set()
+_MAX_WS = 10_000
+_WS_OFFLOAD_SIZE = 16 * 1024
 
 
 @asynccontextmanager
@@ -39,6 +53,7 @@ async def lifespan(app: FastAPI):
     
     # Initialisation
     logger.info("🚀 Démarrage de CyberSec AI Assistant...")
+    logger.info("Boucle d'événements: {}", type(asyncio.get_running_loop()).__name__)
     
     global ai_engine, comm_interface, threat_analyzer
     
@@ -57,13 +72,19 @@ async def lifespan(app: FastAPI):
         logger.info("Initialisation de l'analyseur de menaces...")
         threat_analyzer = ThreatAnalyzer()
         await threat_analyzer.initialize()
+        clear_mitre_technique_cache()
+        
+        # Références exposées aux dépendances des routes (vérifiées une seule fois ici)
+        app.state.ai_engine = ai_engine
+        app.state.comm_interface = comm_interface
+        app.state.threat_analyzer = threat_analyzer
         
         logger.success("✅ CyberSec AI Assistant initialisé avec succès!")
         
         yield
         
     except Exception as e:
-        logger.error(f"❌ Erreur lors de l'initialisation: {e}")
+        logger.error("❌ Erreur lors de l'initialisation: {}", e)
         raise
     
     finally:
@@ -124,7 +145,8 @@ app = FastAPI(
     license_info={
         "name": "MIT License",
     },
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configuration CORS
@@ -136,8 +158,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Compression Gzip
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compression Gzip (la page d'accueil est déjà servie pré-compressée)
+app.add_middleware(GZipMiddleware, minimum_size=4096, compresslevel=5)
 
 # Sécurité
 security = HTTPBearer()
@@ -145,282 +167,38 @@ security = HTTPBearer()
 # Routes
 app.include_router(router, prefix="/api/v1")
 
+# Gestionnaires d'erreur
+app.add_exception_handler(ValueError, value_error_handler)
+app.add_exception_handler(Exception, general_exception_handler)
+
+
+# Page d'accueil: lue et compressée une seule fois au chargement du module
+_STATIC_DIR = Path(__file__).parent / "static"
+_ROOT_HTML_BYTES = (_STATIC_DIR / "index.html").read_bytes()
+_ROOT_HTML_GZ = gzip.compress(_ROOT_HTML_BYTES, compresslevel=9)
+_ROOT_CACHE_CONTROL = "public, max-age=3600"
+
 
 @app.get("/", response_class=HTMLResponse)
-async def root():
+async def root(request: Request):
     """Page d'accueil avec interface web"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>CyberSec AI Assistant 🛡️</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <style>
-            body {
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                min-height: 100vh;
-            }
-            .container {
-                max-width: 1200px;
-                margin: 0 auto;
-                text-align: center;
-            }
-            .header {
-                margin-bottom: 50px;
-            }
-            .logo {
-                font-size: 4em;
-                margin-bottom: 20px;
-            }
-            .tagline {
-                font-size: 1.5em;
-                opacity: 0.9;
-                margin-bottom: 30px;
-            }
-            .features {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                gap: 30px;
-                margin: 50px 0;
-            }
-            .feature {
-                background: rgba(255,255,255,0.1);
-                padding: 30px;
-                border-radius: 15px;
-                backdrop-filter: blur(10px);
-            }
-            .feature h3 {
-                font-size: 1.5em;
-                margin-bottom: 15px;
-                color: #ffd700;
-            }
-            .cta {
-                margin-top: 50px;
-            }
-            .btn {
-                display: inline-block;
-                padding: 15px 30px;
-                background: #ffd700;
-                color: #333;
-                text-decoration: none;
-                border-radius: 25px;
-                font-weight: bold;
-                margin: 0 10px;
-                transition: transform 0.3s;
-            }
-            .btn:hover {
-                transform: translateY(-3px);
-            }
-            .status {
-                margin-top: 30px;
-                padding: 20px;
-                background: rgba(0,255,0,0.2);
-                border-radius: 10px;
-                border: 1px solid rgba(0,255,0,0.5);
-            }
-            .chat-container {
-                background: rgba(255,255,255,0.1);
-                border-radius: 15px;
-                padding: 20px;
-                margin-top: 30px;
-                text-align: left;
-            }
-            #chatMessages {
-                height: 300px;
-                overflow-y: auto;
-                background: rgba(0,0,0,0.3);
-                padding: 10px;
-                border-radius: 10px;
-                margin-bottom: 15px;
-            }
-            .message {
-                margin-bottom: 10px;
-                padding: 8px 12px;
-                border-radius: 8px;
-                max-width: 80%;
-            }
-            .user-message {
-                background: rgba(100,149,237,0.7);
-                margin-left: auto;
-                text-align: right;
-            }
-            .ai-message {
-                background: rgba(50,205,50,0.7);
-            }
-            .input-group {
-                display: flex;
-                gap: 10px;
-            }
-            #messageInput {
-                flex: 1;
-                padding: 10px;
-                border: none;
-                border-radius: 25px;
-                background: rgba(255,255,255,0.9);
-                color: #333;
-            }
-            #sendButton {
-                padding: 10px 20px;
-                background: #ffd700;
-                color: #333;
-                border: none;
-                border-radius: 25px;
-                cursor: pointer;
-                font-weight: bold;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <header class="header">
-                <div class="logo">🛡️</div>
-                <h1>CyberSec AI Assistant</h1>
-                <div class="tagline">Intelligence Artificielle Avancée en Cybersécurité</div>
-            </header>
-            
-            <div class="status">
-                <h3>🟢 Système Opérationnel</h3>
-                <p>Prêt à analyser les menaces et à vous assister</p>
-            </div>
-            
-            <div class="features">
-                <div class="feature">
-                    <h3>🔍 Analyse de Menaces</h3>
-                    <p>Détection automatique de malwares, IoCs et comportements suspects avec corrélation intelligente des indicateurs.</p>
-                </div>
-                <div class="feature">
-                    <h3>💬 Communication Naturelle</h3>
-                    <p>Interface conversationnelle adaptée à votre niveau d'expertise, du novice à l'expert en cybersécurité.</p>
-                </div>
-                <div class="feature">
-                    <h3>⚡ Réponse Temps Réel</h3>
-                    <p>Escalade automatique des alertes critiques avec recommandations immédiates d'actions à entreprendre.</p>
-                </div>
-                <div class="feature">
-                    <h3>📊 Intelligence Prédictive</h3>
-                    <p>Prédiction de menaces futures basée sur l'analyse des tendances et des patterns d'attaque.</p>
-                </div>
-            </div>
-            
-            <div class="chat-container">
-                <h3>💬 Chat en Direct avec l'IA</h3>
-                <div id="chatMessages"></div>
-                <div class="input-group">
-                    <input type="text" id="messageInput" placeholder="Posez votre question sur la cybersécurité..." onkeypress="handleKeyPress(event)">
-                    <button id="sendButton" onclick="sendMessage()">Envoyer</button>
-                </div>
-                <p style="font-size: 0.9em; opacity: 0.7; margin-top: 10px;">
-                    💡 Exemples: "Analyse cette adresse IP", "Comment détecter un ransomware?", "Que faire en cas d'incident?"
-                </p>
-            </div>
-            
-            <div class="cta">
-                <a href="/docs" class="btn">📚 Documentation API</a>
-                <a href="/api/v1/health" class="btn">🔧 Status Système</a>
-            </div>
-        </div>
-        
-        <script>
-            // WebSocket pour le chat en temps réel
-            let ws = null;
-            let currentSessionId = 'session_' + Math.random().toString(36).substr(2, 9);
-            
-            function connectWebSocket() {
-                ws = new WebSocket(`ws://localhost:8000/api/v1/ws/${currentSessionId}`);
-                
-                ws.onopen = function(event) {
-                    console.log('WebSocket connecté');
-                    addMessage('Connexion établie avec CyberSec AI Assistant 🛡️', 'ai');
-                };
-                
-                ws.onmessage = function(event) {
-                    const data = JSON.parse(event.data);
-                    addMessage(data.content, 'ai');
-                    
-                    if (data.urgency === 'critical') {
-                        document.body.style.background = 'linear-gradient(135deg, #ff6b6b 0%, #ee5a52 100%)';
-                        setTimeout(() => {
-                            document.body.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
-                        }, 3000);
-                    }
-                };
-                
-                ws.onclose = function(event) {
-                    console.log('WebSocket fermé');
-                    addMessage('Connexion fermée. Tentative de reconnexion...', 'ai');
-                    setTimeout(connectWebSocket, 3000);
-                };
-                
-                ws.onerror = function(error) {
-                    console.error('Erreur WebSocket:', error);
-                    addMessage('Erreur de connexion. Utilisation du mode API REST.', 'ai');
-                };
-            }
-            
-            function addMessage(content, sender) {
-                const messagesDiv = document.getElementById('chatMessages');
-                const messageDiv = document.createElement('div');
-                messageDiv.className = `message ${sender}-message`;
-                messageDiv.textContent = content;
-                messagesDiv.appendChild(messageDiv);
-                messagesDiv.scrollTop = messagesDiv.scrollHeight;
-            }
-            
-            async function sendMessage() {
-                const input = document.getElementById('messageInput');
-                const message = input.value.trim();
-                
-                if (!message) return;
-                
-                addMessage(message, 'user');
-                input.value = '';
-                
-                if (ws && ws.readyState === WebSocket.OPEN) {
-                    ws.send(JSON.stringify({
-                        content: message,
-                        user_id: 'web_user',
-                        session_id: currentSessionId
-                    }));
-                } else {
-                    // Fallback vers API REST
-                    try {
-                        const response = await fetch('/api/v1/chat', {
-                            method: 'POST',
-                            headers: {
-                                'Content-Type': 'application/json',
-                            },
-                            body: JSON.stringify({
-                                content: message,
-                                user_id: 'web_user',
-                                session_id: currentSessionId
-                            })
-                        });
-                        
-                        const data = await response.json();
-                        addMessage(data.content, 'ai');
-                    } catch (error) {
-                        addMessage('Erreur lors de l\'envoi du message: ' + error.message, 'ai');
-                    }
-                }
-            }
-            
-            function handleKeyPress(event) {
-                if (event.key === 'Enter') {
-                    sendMessage();
-                }
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=_ROOT_HTML_GZ,
+            media_type="text/html",
+            headers={
+                "Content-Encoding": "gzip",
+                "Vary": "Accept-Encoding",
+                "Cache-Control": _ROOT_CACHE_CONTROL
             }
-            
-            // Démarrage automatique
-            connectWebSocket();
-        </script>
-    </body>
-    </html>
-    """
+        )
+    
+    return Response(
+        content=_ROOT_HTML_BYTES,
+        media_type="text/html",
+        headers={"Vary": "Accept-Encoding", "Cache-Control": _ROOT_CACHE_CONTROL}
+    )
 
 
 @app.get("/health")
@@ -454,15 +232,55 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """Endpoint WebSocket pour communication en temps réel"""
     
     await websocket.accept()
+    
+    # Capacité atteinte: fermeture de la connexion inactive depuis le plus longtemps
+    if session_id not in websocket_connections and len(websocket_connections) >= _MAX_WS:
+        evicted_id, evicted_ws = websocket_connections.popitem(last=False)
+        msgpack_sessions.discard(evicted_id)
+        logger.warning("Limite de connexions WebSocket atteinte, fermeture de {}", evicted_id)
+        try:
+            await evicted_ws.close()
+        except Exception:
+            pass
+    
     websocket_connections[session_id] = websocket
+    websocket_connections.move_to_end(session_id)
     
-    logger.info(f"Nouvelle connexion WebSocket: {session_id}")
+    logger.info("Nouvelle connexion WebSocket: {}", session_id)
     
     try:
         while True:
-            # Réception du message
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
+            # Réception du message (texte JSON, ou binaire MessagePack si disponible)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            # Session active: repoussée en fin d'ordre d'éviction
+            if session_id in websocket_connections:
+                websocket_connections.move_to_end(session_id)
+            
+            # Format de réponse choisi trame par trame; le dernier format reçu
+            # ne sert qu'aux notifications de la session
+            binary_frame = message.get("bytes") is not None and msgpack is not None
+            if binary_frame:
+                data = message["bytes"]
+                decode = partial(msgpack.unpackb, raw=False)
+                msgpack_sessions.add(session_id)
+            else:
+                data = message.get("text") or message.get("bytes")
+                decode = orjson.loads
+                msgpack_sessions.discard(session_id)
+            
+            # Trame vide: rien à décoder
+            if not data:
+                logger.warning("Trame WebSocket vide ignorée: {}", session_id)
+                continue
+            
+            # Les gros messages sont décodés hors de la boucle d'événements
+            if len(data) > _WS_OFFLOAD_SIZE:
+                message_data = await asyncio.to_thread(decode, data)
+            else:
+                message_data = decode(data)
             
             # Traitement par l'interface de communication
             response = await comm_interface.process_message(
@@ -472,66 +290,86 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 mode=CommunicationMode.TEXT
             )
             
-            # Envoi de la réponse
-            await websocket.send_text(json.dumps({
+            # Envoi de la réponse dans le format de la trame reçue
+            # (trame texte pour le client web, qui la lit avec JSON.parse)
+            reply = {
                 "content": response.content,
                 "urgency": response.urgency.value,
                 "recommendations": response.recommendations,
                 "follow_up_questions": response.follow_up_questions,
-                "timestamp": response.timestamp.isoformat()
-            }))
+                "timestamp": response.timestamp
+            }
+            if binary_frame:
+                await websocket.send_bytes(_pack_msgpack(reply))
+            else:
+                await websocket.send_text(orjson.dumps(reply).decode())
             
     except WebSocketDisconnect:
-        logger.info(f"Connexion WebSocket fermée: {session_id}")
+        logger.info("Connexion WebSocket fermée: {}", session_id)
         if session_id in websocket_connections:
             del websocket_connections[session_id]
+        msgpack_sessions.discard(session_id)
         
         # Fermeture de la session
         if comm_interface:
             await comm_interface.close_session(session_id)
 
 
-# Fonction utilitaire pour obtenir les instances globales
-def get_ai_engine() -> CyberSecAI:
-    """Dépendance pour obtenir le moteur IA"""
-    if ai_engine is None:
-        raise HTTPException(status_code=503, detail="Moteur IA non initialisé")
-    return ai_engine
+def _msgpack_default(obj: Any) -> str:
+    """Dates en ISO 8601, comme dans les trames JSON"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(obj).__name__}")
 
 
-def get_comm_interface() -> CommunicationInterface:
-    """Dépendance pour obtenir l'interface de communication"""
-    if comm_interface is None:
-        raise HTTPException(status_code=503, detail="Interface de communication non initialisée")
-    return comm_interface
-
-
-def get_threat_analyzer() -> ThreatAnalyzer:
-    """Dépendance pour obtenir l'analyseur de menaces"""
-    if threat_analyzer is None:
-        raise HTTPException(status_code=503, detail="Analyseur de menaces non initialisé")
-    return threat_analyzer
+def _pack_msgpack(payload: Dict[str, Any]) -> bytes:
+    """Sérialisation MessagePack d'une trame WebSocket"""
+    return msgpack.packb(payload, use_bin_type=True, default=_msgpack_default)
 
 
 async def send_notification(user_id: str, message: str, urgency: str = "medium"):
     """Envoi de notification via WebSocket si connecté"""
     
-    # Recherche de la session active de l'utilisateur
-    for session_id, ws in websocket_connections.items():
-        try:
-            await ws.send_text(json.dumps({
-                "type": "notification",
-                "content": message,
-                "urgency": urgency,
-                "timestamp": datetime.utcnow().isoformat()
-            }))
-        except:
+    notification = {
+        "type": "notification",
+        "content": message,
+        "urgency": urgency,
+        "timestamp": datetime.utcnow()
+    }
+    
+    # Sessions de l'utilisateur via l'index, plutôt qu'un parcours des connexions
+    session_ids = comm_interface.user_sessions.get(user_id, ()) if comm_interface else ()
+    targets = [
+        (session_id, websocket_connections[session_id]) for session_id in session_ids
+        if session_id in websocket_connections
+    ]
+    
+    # Message sérialisé une seule fois par format pour toutes les sessions
+    text_payload = orjson.dumps(notification).decode()
+    binary_payload = (
+        _pack_msgpack(notification)
+        if any(session_id in msgpack_sessions for session_id, _ in targets) else None
+    )
+    
+    # Envois concurrents plutôt que séquentiels
+    results = await asyncio.gather(
+        *(
+            ws.send_bytes(binary_payload) if session_id in msgpack_sessions else ws.send_text(text_payload)
+            for session_id, ws in targets
+        ),
+        return_exceptions=True
+    )
+    
+    for (session_id, _), result in zip(targets, results):
+        if isinstance(result, Exception):
             # Connexion fermée, nettoyage
-            if session_id in websocket_connections:
-                del websocket_connections[session_id]
+            websocket_connections.pop(session_id, None)
+            msgpack_sessions.discard(session_id)
 
 
 if __name__ == "__main__":
+    import uvicorn
+    
     # Démarrage en mode développement
     uvicorn.run(
         "api.main:app",
@@ -539,5 +377,7 @@ if __name__ == "__main__":
         port=config.api_port,
         reload=config.debug,
         workers=1 if config.debug else config.api_workers,
-        log_level=config.log_level.lower()
+        log_level=config.log_level.lower(),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
\ No newline at end of file
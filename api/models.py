@@ -6,8 +6,8 @@ Schémas de données pour les requêtes et réponses de l'API.
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field, validator
+from typing import List, Optional, Dict, Any, Tuple, Union
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from enum import Enum
 
 
@@ -46,13 +46,16 @@ class ChatRequest(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(None, description="Métadonnées additionnelles")
     attachments: Optional[List[str]] = Field(None, description="Fichiers attachés")
     
-    @validator('content')
+    @field_validator('content')
+    @classmethod
     def validate_content(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Le contenu ne peut pas être vide')
+        # Longueur vérifiée avant toute copie, puis un seul strip
         if len(v) > 10000:
             raise ValueError('Le contenu ne peut pas dépasser 10000 caractères')
-        return v.strip()
+        content = v.strip()
+        if not content:
+            raise ValueError('Le contenu ne peut pas être vide')
+        return content
 
 
 class ThreatAnalysisRequest(BaseModel):
@@ -61,7 +64,8 @@ class ThreatAnalysisRequest(BaseModel):
     context: Optional[str] = Field(None, description="Contexte de l'analyse")
     user_id: str = Field(..., description="Identifiant utilisateur")
     
-    @validator('indicators')
+    @field_validator('indicators')
+    @classmethod
     def validate_indicators(cls, v):
         if not v:
             raise ValueError('Au moins un indicateur est requis')
@@ -79,7 +83,12 @@ class ReportRequest(BaseModel):
 
 
 # Modèles de réponse
-class SecurityAlertResponse(BaseModel):
+class _ResponseModel(BaseModel):
+    """Base des réponses: construites une fois par requête puis sérialisées, jamais modifiées"""
+    model_config = ConfigDict(frozen=True)
+
+
+class SecurityAlertResponse(_ResponseModel):
     """Réponse d'alerte de sécurité"""
     alert_id: str
     severity: SeverityEnum
@@ -91,7 +100,7 @@ class SecurityAlertResponse(BaseModel):
     timestamp: datetime
 
 
-class ChatResponse(BaseModel):
+class ChatResponse(_ResponseModel):
     """Réponse de chat"""
     response_id: str
     message_id: str
@@ -100,12 +109,12 @@ class ChatResponse(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0)
     urgency: UrgencyLevelEnum
     timestamp: datetime
-    security_alert: Optional[SecurityAlertResponse]
+    security_alert: Optional[SecurityAlertResponse] = None
     recommendations: List[str]
     follow_up_questions: List[str]
 
 
-class ThreatIndicatorResponse(BaseModel):
+class ThreatIndicatorResponse(_ResponseModel):
     """Réponse d'indicateur de menace"""
     type: str
     value: str
@@ -117,7 +126,7 @@ class ThreatIndicatorResponse(BaseModel):
     severity: SeverityEnum
 
 
-class ThreatAnalysisResponse(BaseModel):
+class ThreatAnalysisResponse(_ResponseModel):
     """Réponse d'analyse de menace"""
     timestamp: datetime
     indicators_analyzed: int
@@ -127,7 +136,7 @@ class ThreatAnalysisResponse(BaseModel):
     mitre_techniques: List[str]
 
 
-class ThreatCorrelationResponse(BaseModel):
+class ThreatCorrelationResponse(_ResponseModel):
     """Réponse de corrélation de menaces"""
     campaign_id: str
     indicators_count: int
@@ -138,7 +147,7 @@ class ThreatCorrelationResponse(BaseModel):
     indicators: List[str]
 
 
-class ThreatPredictionResponse(BaseModel):
+class ThreatPredictionResponse(_ResponseModel):
     """Réponse de prédiction de menace"""
     threat_type: str
     predicted_incidents: int
@@ -147,7 +156,7 @@ class ThreatPredictionResponse(BaseModel):
     recommendation: str
 
 
-class ThreatReportResponse(BaseModel):
+class ThreatReportResponse(_ResponseModel):
     """Réponse de rapport de menace"""
     report_id: str
     generated_at: datetime
@@ -159,7 +168,7 @@ class ThreatReportResponse(BaseModel):
     executive_summary: str
 
 
-class SessionSummaryResponse(BaseModel):
+class SessionSummaryResponse(_ResponseModel):
     """Réponse de résumé de session"""
     session_id: str
     user_id: str
@@ -169,12 +178,12 @@ class SessionSummaryResponse(BaseModel):
     response_count: int
     urgency_level: UrgencyLevelEnum
     active_alerts: int
-    main_topics: List[tuple]
+    main_topics: List[Tuple[str, int]]
     last_activity: datetime
     status: str
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(_ResponseModel):
     """Réponse de statut système"""
     status: str
     timestamp: datetime
@@ -182,7 +191,7 @@ class HealthResponse(BaseModel):
     components: Dict[str, Union[bool, int]]
 
 
-class UserSessionsResponse(BaseModel):
+class UserSessionsResponse(_ResponseModel):
     """Réponse des sessions utilisateur"""
     user_id: str
     sessions: List[SessionSummaryResponse]
@@ -190,7 +199,7 @@ class UserSessionsResponse(BaseModel):
 
 
 # Modèles d'erreur
-class ErrorResponse(BaseModel):
+class ErrorResponse(_ResponseModel):
     """Réponse d'erreur"""
     error: str
     detail: str
@@ -198,7 +207,7 @@ class ErrorResponse(BaseModel):
     request_id: Optional[str] = None
 
 
-class ValidationErrorResponse(BaseModel):
+class ValidationErrorResponse(_ResponseModel):
     """Réponse d'erreur de validation"""
     error: str = "Validation Error"
     details: List[Dict[str, Any]]
@@ -214,7 +223,7 @@ class WebSocketMessage(BaseModel):
     timestamp: Optional[datetime] = None
 
 
-class WebSocketResponse(BaseModel):
+class WebSocketResponse(_ResponseModel):
     """Réponse WebSocket"""
     content: str
     urgency: UrgencyLevelEnum
@@ -255,7 +264,7 @@ class UpdatePreferencesRequest(BaseModel):
 
 
 # Modèles pour les statistiques
-class SystemStatsResponse(BaseModel):
+class SystemStatsResponse(_ResponseModel):
     """Statistiques système"""
     total_sessions: int
     active_sessions: int
@@ -266,14 +275,14 @@ class SystemStatsResponse(BaseModel):
     last_updated: datetime
 
 
-class UserStatsResponse(BaseModel):
+class UserStatsResponse(_ResponseModel):
     """Statistiques utilisateur"""
     user_id: str
     total_sessions: int
     total_messages: int
     threats_detected: int
     average_session_duration: float
-    most_common_topics: List[tuple]
+    most_common_topics: List[Tuple[str, int]]
     last_activity: datetime
 
 
@@ -281,18 +290,12 @@ class UserStatsResponse(BaseModel):
 class BatchAnalysisRequest(BaseModel):
     """Requête d'analyse en lot"""
     batch_id: str
-    indicators: List[str] = Field(..., max_items=1000)
+    indicators: List[str] = Field(..., min_length=1, max_length=1000)
     user_id: str
     priority: UrgencyLevelEnum = UrgencyLevelEnum.MEDIUM
-    
-    @validator('indicators')
-    def validate_indicators(cls, v):
-        if len(v) == 0:
-            raise ValueError('Au moins un indicateur est requis')
-        return v
 
 
-class BatchAnalysisResponse(BaseModel):
+class BatchAnalysisResponse(_ResponseModel):
     """Réponse d'analyse en lot"""
     batch_id: str
     status: str  # pending, processing, completed, failed
@@ -6,18 +6,45 @@ Endpoints pour l'interaction avec CyberSec AI Assistant.
 """
 
 import asyncio
-import uuid
+import secrets
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
-from fastapi.responses import JSONResponse
+from functools import lru_cache
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from loguru import logger
+import orjson
+from pydantic import TypeAdapter
 
-from core.ai_engine import CyberSecAI
-from communication.interface import CommunicationInterface, CommunicationMode, UrgencyLevel
+from communication.interface import CommunicationMode, UrgencyLevel
 from security.threat_analyzer import ThreatAnalyzer
 from .models import *
-from .main import get_ai_engine, get_comm_interface, get_threat_analyzer
+from .dependencies import AIEngineDep, CommInterfaceDep, ThreatAnalyzerDep
+
+# Correspondances entre les enums de l'API et ceux de l'interface de communication
+_MODE_MAP = {mode: CommunicationMode(mode.value) for mode in CommunicationModeEnum}
+_URGENCY_MAP = {urgency: UrgencyLevel(urgency.value) for urgency in UrgencyLevelEnum}
+_MODE_ENUM_MAP = {mode: api_mode for api_mode, mode in _MODE_MAP.items()}
+_URGENCY_ENUM_MAP = {urgency: api_urgency for api_urgency, urgency in _URGENCY_MAP.items()}
+
+# Enums de l'API indexés par valeur, pour les champs fournis en chaînes par les services
+_SEVERITY_BY_VALUE = {severity.value: severity for severity in SeverityEnum}
+_URGENCY_BY_VALUE = {urgency.value: urgency for urgency in UrgencyLevelEnum}
+
+# Validation des listes de corrélations et de sessions en un seul passage (boucle dans pydantic-core)
+_CORRELATIONS_ADAPTER = TypeAdapter(List[ThreatCorrelationResponse])
+_SESSIONS_ADAPTER = TypeAdapter(List[SessionSummaryResponse])
+
+# Nombre d'indicateurs analysés entre deux retours à la boucle d'événements (analyse en lot)
+_BATCH_CHUNK_SIZE = 32
+
+# Nombre de corrélations à partir duquel un rapport est envoyé en flux
+_REPORT_STREAM_THRESHOLD = 32
+
+# Durée de validité (secondes) de la dernière réponse de /health
+_HEALTH_TTL = 1.0
+_health_cache: Tuple[float, Optional[HealthResponse]] = (0.0, None)
 
 # Création du routeur
 router = APIRouter(
@@ -34,13 +61,20 @@ router = APIRouter(
            summary="Vérification de l'état du système",
            description="Endpoint pour vérifier l'état de santé du système et de ses composants")
 async def health_check(
-    ai_engine: CyberSecAI = Depends(get_ai_engine),
-    comm_interface: CommunicationInterface = Depends(get_comm_interface),
-    threat_analyzer: ThreatAnalyzer = Depends(get_threat_analyzer)
+    ai_engine: AIEngineDep,
+    comm_interface: CommInterfaceDep,
+    threat_analyzer: ThreatAnalyzerDep
 ):
     """Vérification de l'état du système"""
+    global _health_cache
+    
+    # Sondes de disponibilité fréquentes: réponse réutilisée pendant _HEALTH_TTL
+    now = time.monotonic()
+    cached_at, cached = _health_cache
+    if cached is not None and now - cached_at < _HEALTH_TTL:
+        return cached
     
-    return HealthResponse(
+    health = HealthResponse.model_construct(
         status="healthy",
         timestamp=datetime.utcnow(),
         version="1.0.0",
@@ -51,6 +85,8 @@ async def health_check(
             "websocket_connections": 0
         }
     )
+    _health_cache = (now, health)
+    return health
 
 
 @router.post("/chat", 
@@ -59,14 +95,14 @@ async def health_check(
             description="Envoyer un message à l'IA et recevoir une réponse contextuelle")
 async def chat(
     request: ChatRequest,
-    comm_interface: CommunicationInterface = Depends(get_comm_interface)
+    comm_interface: CommInterfaceDep
 ):
     """Endpoint de chat avec l'IA"""
     
     try:
         # Conversion des enums
-        mode = CommunicationMode(request.mode.value)
-        urgency = UrgencyLevel(request.urgency.value)
+        mode = _MODE_MAP[request.mode]
+        urgency = _URGENCY_MAP[request.urgency]
         
         # Traitement du message
         response = await comm_interface.process_message(
@@ -82,9 +118,9 @@ async def chat(
         # Conversion de la réponse
         security_alert = None
         if response.security_alert:
-            security_alert = SecurityAlertResponse(
+            security_alert = SecurityAlertResponse.model_construct(
                 alert_id=response.security_alert.alert_id,
-                severity=SeverityEnum(response.security_alert.severity),
+                severity=_SEVERITY_BY_VALUE[response.security_alert.severity],
                 category=response.security_alert.category,
                 description=response.security_alert.description,
                 indicators=response.security_alert.indicators,
@@ -93,13 +129,13 @@ async def chat(
                 timestamp=response.security_alert.timestamp
             )
         
-        return ChatResponse(
+        return ChatResponse.model_construct(
             response_id=response.response_id,
             message_id=response.message_id,
             content=response.content,
-            mode=CommunicationModeEnum(response.mode.value),
+            mode=_MODE_ENUM_MAP[response.mode],
             confidence=response.confidence,
-            urgency=UrgencyLevelEnum(response.urgency.value),
+            urgency=_URGENCY_ENUM_MAP[response.urgency],
             timestamp=response.timestamp,
             security_alert=security_alert,
             recommendations=response.recommendations,
@@ -107,7 +143,7 @@ async def chat(
         )
         
     except Exception as e:
-        logger.error(f"Erreur lors du chat: {e}")
+        logger.error("Erreur lors du chat: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -117,7 +153,7 @@ async def chat(
             description="Analyser des indicateurs de compromission et évaluer les menaces")
 async def analyze_threats(
     request: ThreatAnalysisRequest,
-    threat_analyzer: ThreatAnalyzer = Depends(get_threat_analyzer)
+    threat_analyzer: ThreatAnalyzerDep
 ):
     """Endpoint d'analyse de menaces"""
     
@@ -125,17 +161,10 @@ async def analyze_threats(
         # Analyse des indicateurs
         analysis = await threat_analyzer.analyze_indicators(request.indicators)
         
-        return ThreatAnalysisResponse(
-            timestamp=analysis["timestamp"],
-            indicators_analyzed=analysis["indicators_analyzed"],
-            threats_detected=analysis["threats_detected"],
-            risk_score=analysis["risk_score"],
-            recommendations=analysis["recommendations"],
-            mitre_techniques=analysis["mitre_techniques"]
-        )
+        return ThreatAnalysisResponse.model_construct(**analysis)
         
     except Exception as e:
-        logger.error(f"Erreur lors de l'analyse: {e}")
+        logger.error("Erreur lors de l'analyse: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -144,29 +173,18 @@ async def analyze_threats(
            summary="Corrélation de menaces",
            description="Obtenir les corrélations de menaces détectées")
 async def get_threat_correlations(
-    time_window: int = Query(3600, description="Fenêtre temporelle en secondes"),
-    threat_analyzer: ThreatAnalyzer = Depends(get_threat_analyzer)
+    threat_analyzer: ThreatAnalyzerDep,
+    time_window: int = Query(3600, description="Fenêtre temporelle en secondes")
 ):
     """Endpoint de corrélation de menaces"""
     
     try:
         correlations = await threat_analyzer.correlate_threats(time_window)
         
-        return [
-            ThreatCorrelationResponse(
-                campaign_id=corr["campaign_id"],
-                indicators_count=corr["indicators_count"],
-                confidence=corr["confidence"],
-                severity=SeverityEnum(corr["severity"]),
-                first_seen=corr["first_seen"],
-                last_seen=corr["last_seen"],
-                indicators=corr["indicators"]
-            )
-            for corr in correlations
-        ]
+        return _CORRELATIONS_ADAPTER.validate_python(correlations)
         
     except Exception as e:
-        logger.error(f"Erreur lors de la corrélation: {e}")
+        logger.error("Erreur lors de la corrélation: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -176,62 +194,38 @@ async def get_threat_correlations(
             description="Générer un rapport complet d'analyse de menaces")
 async def generate_threat_report(
     request: ReportRequest,
-    threat_analyzer: ThreatAnalyzer = Depends(get_threat_analyzer)
+    threat_analyzer: ThreatAnalyzerDep
 ):
     """Endpoint de génération de rapport"""
     
     try:
         report = await threat_analyzer.generate_threat_report(request.indicators)
         
+        # Rapports volumineux: envoi progressif plutôt que sérialisation complète en mémoire
+        if len(report["threat_correlations"]) >= _REPORT_STREAM_THRESHOLD:
+            return StreamingResponse(_stream_report(report), media_type="application/json")
+        
         # Conversion des corrélations
-        correlations = [
-            ThreatCorrelationResponse(
-                campaign_id=corr["campaign_id"],
-                indicators_count=corr["indicators_count"],
-                confidence=corr["confidence"],
-                severity=SeverityEnum(corr["severity"]),
-                first_seen=corr["first_seen"],
-                last_seen=corr["last_seen"],
-                indicators=corr["indicators"]
-            )
-            for corr in report["threat_correlations"]
-        ]
+        correlations = _CORRELATIONS_ADAPTER.validate_python(report["threat_correlations"])
         
         # Conversion des prédictions
         predictions = [
-            ThreatPredictionResponse(
-                threat_type=pred["threat_type"],
-                predicted_incidents=pred["predicted_incidents"],
-                confidence=pred["confidence"],
-                time_frame=pred["time_frame"],
-                recommendation=pred["recommendation"]
-            )
+            ThreatPredictionResponse.model_construct(**pred)
             for pred in report["future_predictions"]
         ]
         
         # Conversion de l'analyse détaillée
-        detailed_analysis = ThreatAnalysisResponse(
-            timestamp=report["detailed_analysis"]["timestamp"],
-            indicators_analyzed=report["detailed_analysis"]["indicators_analyzed"],
-            threats_detected=report["detailed_analysis"]["threats_detected"],
-            risk_score=report["detailed_analysis"]["risk_score"],
-            recommendations=report["detailed_analysis"]["recommendations"],
-            mitre_techniques=report["detailed_analysis"]["mitre_techniques"]
-        )
+        detailed_analysis = ThreatAnalysisResponse.model_construct(**report["detailed_analysis"])
         
-        return ThreatReportResponse(
-            report_id=report["report_id"],
-            generated_at=report["generated_at"],
-            summary=report["summary"],
-            detailed_analysis=detailed_analysis,
-            threat_correlations=correlations,
-            future_predictions=predictions,
-            mitre_mapping=report["mitre_mapping"],
-            executive_summary=report["executive_summary"]
-        )
+        return ThreatReportResponse.model_construct(**{
+            **report,
+            "detailed_analysis": detailed_analysis,
+            "threat_correlations": correlations,
+            "future_predictions": predictions
+        })
         
     except Exception as e:
-        logger.error(f"Erreur lors de la génération du rapport: {e}")
+        logger.error("Erreur lors de la génération du rapport: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -241,34 +235,25 @@ async def generate_threat_report(
            description="Obtenir le résumé d'une session de communication")
 async def get_session_summary(
     session_id: str,
-    comm_interface: CommunicationInterface = Depends(get_comm_interface)
+    comm_interface: CommInterfaceDep
 ):
     """Endpoint de résumé de session"""
     
     try:
-        summary = await comm_interface.get_session_summary(session_id)
+        summary = comm_interface.get_session_summary(session_id)
         
         if "error" in summary:
             raise HTTPException(status_code=404, detail=summary["error"])
         
-        return SessionSummaryResponse(
-            session_id=summary["session_id"],
-            user_id=summary["user_id"],
-            created_at=summary["created_at"],
-            duration=summary["duration"],
-            message_count=summary["message_count"],
-            response_count=summary["response_count"],
-            urgency_level=UrgencyLevelEnum(summary["urgency_level"]),
-            active_alerts=summary["active_alerts"],
-            main_topics=summary["main_topics"],
-            last_activity=summary["last_activity"],
-            status=summary["status"]
-        )
+        return SessionSummaryResponse.model_construct(**{
+            **summary,
+            "urgency_level": _URGENCY_BY_VALUE[summary["urgency_level"]]
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération du résumé: {e}")
+        logger.error("Erreur lors de la récupération du résumé: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -278,38 +263,23 @@ async def get_session_summary(
            description="Obtenir toutes les sessions d'un utilisateur")
 async def get_user_sessions(
     user_id: str,
-    comm_interface: CommunicationInterface = Depends(get_comm_interface)
+    comm_interface: CommInterfaceDep
 ):
     """Endpoint des sessions utilisateur"""
     
     try:
-        sessions_data = await comm_interface.get_user_sessions(user_id)
-        
-        sessions = [
-            SessionSummaryResponse(
-                session_id=session["session_id"],
-                user_id=session["user_id"],
-                created_at=session["created_at"],
-                duration=session["duration"],
-                message_count=session["message_count"],
-                response_count=session["response_count"],
-                urgency_level=UrgencyLevelEnum(session["urgency_level"]),
-                active_alerts=session["active_alerts"],
-                main_topics=session["main_topics"],
-                last_activity=session["last_activity"],
-                status=session["status"]
-            )
-            for session in sessions_data
-        ]
+        sessions_data = comm_interface.get_user_sessions(user_id)
+        
+        sessions = _SESSIONS_ADAPTER.validate_python(sessions_data)
         
-        return UserSessionsResponse(
+        return UserSessionsResponse.model_construct(
             user_id=user_id,
             sessions=sessions,
             total_sessions=len(sessions)
         )
         
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération des sessions: {e}")
+        logger.error("Erreur lors de la récupération des sessions: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -318,7 +288,7 @@ async def get_user_sessions(
               description="Fermer une session de communication")
 async def close_session(
     session_id: str,
-    comm_interface: CommunicationInterface = Depends(get_comm_interface)
+    comm_interface: CommInterfaceDep
 ):
     """Endpoint de fermeture de session"""
     
@@ -333,7 +303,7 @@ async def close_session(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la fermeture de session: {e}")
+        logger.error("Erreur lors de la fermeture de session: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -343,7 +313,7 @@ async def close_session(
 async def get_conversation_summary(
     user_id: str,
     session_id: str,
-    ai_engine: CyberSecAI = Depends(get_ai_engine)
+    ai_engine: AIEngineDep
 ):
     """Endpoint de résumé de conversation"""
     
@@ -352,7 +322,7 @@ async def get_conversation_summary(
         return summary
         
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération du résumé de conversation: {e}")
+        logger.error("Erreur lors de la récupération du résumé de conversation: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -363,13 +333,13 @@ async def get_conversation_summary(
 async def batch_analyze(
     request: BatchAnalysisRequest,
     background_tasks: BackgroundTasks,
-    threat_analyzer: ThreatAnalyzer = Depends(get_threat_analyzer)
+    threat_analyzer: ThreatAnalyzerDep
 ):
     """Endpoint d'analyse en lot"""
     
     try:
         # Création de la tâche en arrière-plan
-        batch_id = request.batch_id or f"batch_{uuid.uuid4().hex[:8]}"
+        batch_id = request.batch_id or f"batch_{secrets.token_hex(4)}"
         
         # En production, utiliser une queue (Redis, Celery, etc.)
         background_tasks.add_task(
@@ -379,18 +349,19 @@ async def batch_analyze(
             threat_analyzer
         )
         
-        return BatchAnalysisResponse(
+        now = datetime.utcnow()
+        return BatchAnalysisResponse.model_construct(
             batch_id=batch_id,
             status="pending",
             total_indicators=len(request.indicators),
             processed_indicators=0,
-            estimated_completion=datetime.utcnow(),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            estimated_completion=now,
+            created_at=now,
+            updated_at=now
         )
         
     except Exception as e:
-        logger.error(f"Erreur lors du lancement de l'analyse en lot: {e}")
+        logger.error("Erreur lors du lancement de l'analyse en lot: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -402,13 +373,14 @@ async def get_batch_status(batch_id: str):
     """Endpoint de statut d'analyse en lot"""
     
     # En production, récupérer depuis la base de données
-    return BatchAnalysisResponse(
+    now = datetime.utcnow()
+    return BatchAnalysisResponse.model_construct(
         batch_id=batch_id,
         status="completed",
         total_indicators=10,
         processed_indicators=10,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
+        created_at=now,
+        updated_at=now
     )
 
 
@@ -419,15 +391,16 @@ async def get_batch_status(batch_id: str):
 async def get_system_stats():
     """Endpoint de statistiques système"""
     
-    return SystemStatsResponse(
-        total_sessions=100,
-        active_sessions=5,
-        total_messages=1500,
-        total_threats_detected=50,
-        average_response_time=0.5,
-        uptime=3600.0,
-        last_updated=datetime.utcnow()
-    )
+    # Schéma plat et données internes: sérialisation directe, sans passer par Pydantic
+    return ORJSONResponse({
+        "total_sessions": 100,
+        "active_sessions": 5,
+        "total_messages": 1500,
+        "total_threats_detected": 50,
+        "average_response_time": 0.5,
+        "uptime": 3600.0,
+        "last_updated": _iso_timestamp(int(time.time()))
+    })
 
 
 @router.get("/stats/user/{user_id}",
@@ -437,15 +410,15 @@ async def get_system_stats():
 async def get_user_stats(user_id: str):
     """Endpoint de statistiques utilisateur"""
     
-    return UserStatsResponse(
-        user_id=user_id,
-        total_sessions=10,
-        total_messages=100,
-        threats_detected=5,
-        average_session_duration=300.0,
-        most_common_topics=[("malware", 3), ("network", 2)],
-        last_activity=datetime.utcnow()
-    )
+    return ORJSONResponse({
+        "user_id": user_id,
+        "total_sessions": 10,
+        "total_messages": 100,
+        "threats_detected": 5,
+        "average_session_duration": 300.0,
+        "most_common_topics": [("malware", 3), ("network", 2)],
+        "last_activity": _iso_timestamp(int(time.time()))
+    })
 
 
 @router.post("/preferences",
@@ -463,25 +436,22 @@ async def update_user_preferences(request: UpdatePreferencesRequest):
            description="Obtenir les informations d'une technique MITRE ATT&CK")
 async def get_mitre_technique(
     technique_id: str,
-    threat_analyzer: ThreatAnalyzer = Depends(get_threat_analyzer)
+    threat_analyzer: ThreatAnalyzerDep
 ):
     """Endpoint d'information MITRE ATT&CK"""
     
     try:
-        technique_info = threat_analyzer.mitre_techniques.get(technique_id)
+        technique = _mitre_technique_response(threat_analyzer, technique_id)
         
-        if not technique_info:
+        if technique is None:
             raise HTTPException(status_code=404, detail="Technique MITRE non trouvée")
         
-        return {
-            "technique_id": technique_id,
-            **technique_info
-        }
+        return technique
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération de la technique MITRE: {e}")
+        logger.error("Erreur lors de la récupération de la technique MITRE: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -490,7 +460,7 @@ async def get_mitre_technique(
            description="Obtenir les informations détaillées sur un indicateur")
 async def get_indicator_info(
     indicator_value: str,
-    threat_analyzer: ThreatAnalyzer = Depends(get_threat_analyzer)
+    threat_analyzer: ThreatAnalyzerDep
 ):
     """Endpoint d'information sur un indicateur"""
     
@@ -500,25 +470,94 @@ async def get_indicator_info(
         if not indicator_info:
             raise HTTPException(status_code=404, detail="Indicateur non trouvé")
         
-        return ThreatIndicatorResponse(
-            type=indicator_info.type,
-            value=indicator_info.value,
-            confidence=indicator_info.confidence,
-            source=indicator_info.source,
-            first_seen=indicator_info.first_seen,
-            last_seen=indicator_info.last_seen,
-            tags=indicator_info.tags,
-            severity=SeverityEnum(indicator_info.severity)
+        # Clé de cache: l'ensemble des champs, pour qu'une mise à jour du flux
+        # de menaces produise une nouvelle réponse
+        return _indicator_response(
+            indicator_info.type,
+            indicator_info.value,
+            indicator_info.confidence,
+            indicator_info.source,
+            indicator_info.first_seen,
+            indicator_info.last_seen,
+            tuple(indicator_info.tags),
+            indicator_info.severity
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erreur lors de la récupération de l'indicateur: {e}")
+        logger.error("Erreur lors de la récupération de l'indicateur: {}", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Fonctions utilitaires
+@lru_cache(maxsize=2)
+def _iso_timestamp(epoch_second: int) -> str:
+    """Horodatage ISO 8601 (UTC, sans fuseau comme datetime.utcnow) d'une seconde donnée"""
+    return datetime.utcfromtimestamp(epoch_second).isoformat()
+
+
+def _stream_report(report: Dict[str, Any]) -> Iterator[bytes]:
+    """Sérialisation JSON progressive d'un rapport, corrélation par corrélation"""
+    header = {key: value for key, value in report.items() if key != "threat_correlations"}
+    
+    # Objet d'en-tête sans son accolade fermante, suivi de la liste des corrélations
+    yield orjson.dumps(header)[:-1]
+    yield b',"threat_correlations":['
+    for index, correlation in enumerate(report["threat_correlations"]):
+        if index:
+            yield b","
+        yield orjson.dumps(correlation)
+    yield b"]}"
+
+
+# Réponses des techniques MITRE connues: bornées par le référentiel, les identifiants
+# inconnus ne sont jamais mémorisés. Vidées à chaque initialisation de l'analyseur.
+_mitre_technique_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def _mitre_technique_response(threat_analyzer: ThreatAnalyzer, technique_id: str) -> Optional[Dict[str, Any]]:
+    """Réponse d'une technique MITRE, mémorisée une fois trouvée dans le référentiel"""
+    technique = _mitre_technique_cache.get(technique_id)
+    
+    if technique is None:
+        technique_info = threat_analyzer.mitre_techniques.get(technique_id)
+        if not technique_info:
+            return None
+        technique = _mitre_technique_cache[technique_id] = {"technique_id": technique_id, **technique_info}
+    
+    return technique
+
+
+def clear_mitre_technique_cache():
+    """Invalidation des réponses MITRE (référentiel rechargé)"""
+    _mitre_technique_cache.clear()
+
+
+@lru_cache(maxsize=4096)
+def _indicator_response(
+    indicator_type: str,
+    value: str,
+    confidence: float,
+    source: str,
+    first_seen: datetime,
+    last_seen: datetime,
+    tags: Tuple[str, ...],
+    severity: str
+) -> ThreatIndicatorResponse:
+    """Réponse d'indicateur, partagée entre requêtes (les réponses sont immuables)"""
+    return ThreatIndicatorResponse.model_construct(
+        type=indicator_type,
+        value=value,
+        confidence=confidence,
+        source=source,
+        first_seen=first_seen,
+        last_seen=last_seen,
+        tags=list(tags),
+        severity=_SEVERITY_BY_VALUE[severity]
+    )
+
+
 async def process_batch_analysis(
     batch_id: str,
     indicators: List[str],
@@ -527,42 +566,47 @@ async def process_batch_analysis(
     """Traitement d'analyse en lot en arrière-plan"""
     
     try:
-        logger.info(f"Démarrage de l'analyse en lot {batch_id}")
+        logger.info("Démarrage de l'analyse en lot {}", batch_id)
+        
+        # L'analyse est du calcul pur sur la boucle: traitement par tranches,
+        # en rendant la main à la boucle d'événements entre deux tranches
+        results = []
         
-        # Simulation du traitement
-        for i, indicator in enumerate(indicators):
-            # En production, traiter chaque indicateur
-            await asyncio.sleep(0.1)  # Simulation
-            logger.debug(f"Traitement {i+1}/{len(indicators)} pour {batch_id}")
+        for start in range(0, len(indicators), _BATCH_CHUNK_SIZE):
+            for indicator in indicators[start:start + _BATCH_CHUNK_SIZE]:
+                results.append(await threat_analyzer.analyze_indicators([indicator]))
+            
+            logger.debug("Traitement {}/{} pour {}", len(results), len(indicators), batch_id)
+            await asyncio.sleep(0)
         
-        logger.success(f"Analyse en lot {batch_id} terminée")
+        # En production, persister les résultats (Redis, base de données...)
+        logger.success("Analyse en lot {} terminée: {} indicateurs analysés", batch_id, len(results))
         
     except Exception as e:
-        logger.error(f"Erreur lors de l'analyse en lot {batch_id}: {e}")
+        logger.error("Erreur lors de l'analyse en lot {}: {}", batch_id, e)
 
 
-# Gestionnaires d'erreur
-@router.exception_handler(ValueError)
+# Gestionnaires d'erreur (enregistrés sur l'application dans api/main.py,
+# APIRouter ne gérant pas les exceptions)
 async def value_error_handler(request, exc):
     """Gestionnaire d'erreur de validation"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content=ValidationErrorResponse(
             details=[{"error": str(exc)}],
             timestamp=datetime.utcnow()
-        ).dict()
+        ).model_dump()
     )
 
 
-@router.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Gestionnaire d'erreur général"""
-    logger.error(f"Erreur non gérée: {exc}")
-    return JSONResponse(
+    logger.error("Erreur non gérée: {}", exc)
+    return ORJSONResponse(
         status_code=500,
         content=ErrorResponse(
             error="Erreur interne du serveur",
             detail=str(exc),
             timestamp=datetime.utcnow()
-        ).dict()
+        ).model_dump()
     )
\ No newline at end of file
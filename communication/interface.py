@@ -7,11 +7,14 @@ Interface multimodale pour la communication avec les experts en sécurité.
 
 import asyncio
 import json
-import uuid
-from typing import Dict, List, Optional, Any, Union
+import re
+import secrets
+from collections import Counter, defaultdict, deque
+from typing import Deque, Dict, List, Optional, Any, Sequence, Set
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
+from operator import itemgetter
 from loguru import logger
 
 from core.ai_engine import CyberSecAI, ConversationContext, SecurityAlert
@@ -34,7 +37,81 @@ class UrgencyLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+# Rang de chaque niveau d'urgence (ordre de déclaration), pour les comparaisons
+_URGENCY_RANK = {level: rank for rank, level in enumerate(UrgencyLevel)}
+
+# Urgence correspondant à la sévérité d'une alerte de sécurité
+_URGENCY_BY_SEVERITY = {
+    "critical": UrgencyLevel.CRITICAL,
+    "high": UrgencyLevel.HIGH,
+    "medium": UrgencyLevel.MEDIUM,
+    "low": UrgencyLevel.LOW
+}
+
+# Urgences déclenchant une escalade, et sévérités d'alerte appelant des questions de suivi
+_ESCALATION_URGENCIES = frozenset({UrgencyLevel.HIGH, UrgencyLevel.CRITICAL})
+_SERIOUS_SEVERITIES = frozenset({"high", "critical"})
+
+# Questions de suivi: alertes sérieuses, catégories d'alerte, mots-clés du message
+_SERIOUS_ALERT_QUESTIONS = (
+    "Avez-vous observé d'autres comportements suspects récemment ?",
+    "Quels systèmes pourraient être affectés ?",
+    "Disposez-vous de logs additionnels pour l'analyse ?"
+)
+_ALERT_CATEGORY_QUESTIONS = (
+    ("malware", (
+        "Sur quels systèmes ce fichier a-t-il été détecté ?",
+        "Y a-t-il eu des modifications récentes sur ces machines ?"
+    )),
+    ("network", (
+        "Avez-vous noté des ralentissements réseau ?",
+        "D'autres adresses IP suspectes ont-elles été observées ?"
+    ))
+)
+_MESSAGE_KEYWORD_QUESTIONS = (
+    ("analyse", "Souhaitez-vous une analyse plus détaillée ?"),
+    ("protection", "Voulez-vous que je vous guide dans la mise en place des protections ?"),
+    ("incident", "Faut-il documenter cet incident dans le système de gestion ?")
+)
+
+# Recommandations selon l'urgence, puis recommandations générales
+_URGENCY_RECOMMENDATIONS = {
+    UrgencyLevel.CRITICAL: (
+        "Isoler immédiatement les systèmes affectés",
+        "Activer la cellule de crise",
+        "Documenter toutes les actions entreprises",
+        "Préparer la communication de crise"
+    ),
+    UrgencyLevel.HIGH: (
+        "Renforcer la surveillance",
+        "Vérifier l'intégrité des sauvegardes",
+        "Informer l'équipe de sécurité",
+        "Préparer un plan de réponse"
+    )
+}
+_GENERAL_RECOMMENDATIONS = (
+    "Maintenir une communication régulière",
+    "Documenter les observations",
+    "Suivre les procédures établies"
+)
+
+# Durée d'inactivité au-delà de laquelle une session est signalée inactive
+_SESSION_ACTIVE_WINDOW = timedelta(minutes=30)
+
+
+# Substitutions pour la synthèse vocale
+_VOICE_SUBSTITUTIONS = {
+    "🚨": "ALERTE",
+    "⚠️": "ATTENTION",
+    "ℹ️": "INFORMATION",
+    ". ": ". [pause] ",
+    "? ": "? [pause] ",
+    "! ": "! [pause] "
+}
+_VOICE_PATTERN = re.compile("|".join(map(re.escape, _VOICE_SUBSTITUTIONS)))
+
+
+@dataclass(slots=True, frozen=True)
 class Message:
     """Structure d'un message"""
     message_id: str
@@ -45,14 +122,10 @@ class Message:
     timestamp: datetime
     urgency: UrgencyLevel
     metadata: Dict[str, Any]
-    attachments: List[str] = None
-    
-    def __post_init__(self):
-        if self.attachments is None:
-            self.attachments = []
+    attachments: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Response:
     """Structure d'une réponse"""
     response_id: str
@@ -82,9 +155,11 @@ class CommunicationInterface:
     def __init__(self, ai_engine: CyberSecAI):
         self.ai_engine = ai_engine
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
-        self.message_history: Dict[str, List[Message]] = {}
-        self.response_history: Dict[str, List[Response]] = {}
-        self.escalation_handlers: Dict[str, callable] = {}
+        self.user_sessions: Dict[str, Set[str]] = defaultdict(set)  # user_id -> session_ids
+        self.message_history: Dict[str, Deque[Message]] = {}
+        self.response_history: Dict[str, Deque[Response]] = {}
+        self.message_to_session: Dict[str, str] = {}  # message_id -> session_id
+        self._bg_tasks: Set[asyncio.Task] = set()  # Escalades en cours, référencées jusqu'à leur fin
         
     async def initialize(self):
         """Initialisation de l'interface de communication"""
@@ -95,27 +170,15 @@ class CommunicationInterface:
             if not self.ai_engine.model:
                 await self.ai_engine.initialize()
             
-            # Configuration des handlers d'escalade
-            await self._setup_escalation_handlers()
-            
             # Initialisation des canaux de communication
             await self._setup_communication_channels()
             
             logger.success("Interface de communication initialisée")
             
         except Exception as e:
-            logger.error(f"Erreur lors de l'initialisation: {e}")
+            logger.error("Erreur lors de l'initialisation: {}", e)
             raise
     
-    async def _setup_escalation_handlers(self):
-        """Configuration des handlers pour l'escalade d'alertes"""
-        self.escalation_handlers = {
-            UrgencyLevel.CRITICAL.value: self._handle_critical_escalation,
-            UrgencyLevel.HIGH.value: self._handle_high_escalation,
-            UrgencyLevel.MEDIUM.value: self._handle_medium_escalation,
-            UrgencyLevel.LOW.value: self._handle_low_escalation
-        }
-    
     async def _setup_communication_channels(self):
         """Configuration des canaux de communication"""
         # Configuration des canaux (WebSocket, REST API, etc.)
@@ -149,10 +212,13 @@ class CommunicationInterface:
         
         # Génération d'IDs si nécessaires
         if session_id is None:
-            session_id = f"session_{uuid.uuid4().hex[:8]}"
+            session_id = f"session_{secrets.token_hex(4)}"
         
-        message_id = f"msg_{uuid.uuid4().hex[:8]}"
-        response_id = f"resp_{uuid.uuid4().hex[:8]}"
+        message_id = f"msg_{secrets.token_hex(4)}"
+        response_id = f"resp_{secrets.token_hex(4)}"
+        
+        # Horodatage de réception, réutilisé pour la tenue de la session
+        now = datetime.utcnow()
         
         # Création du message
         message = Message(
@@ -161,14 +227,14 @@ class CommunicationInterface:
             session_id=session_id,
             content=content,
             mode=mode,
-            timestamp=datetime.utcnow(),
+            timestamp=now,
             urgency=urgency,
             metadata=metadata or {},
             attachments=attachments or []
         )
         
         # Sauvegarde du message
-        await self._save_message(message)
+        self._save_message(message)
         
         try:
             # Traitement par le moteur IA
@@ -177,19 +243,15 @@ class CommunicationInterface:
             )
             
             # Analyse de l'urgence et adaptation de la réponse
-            adapted_response, detected_urgency = await self._adapt_response(
+            adapted_response, detected_urgency = self._adapt_response(
                 ai_response, security_alert, urgency, mode
             )
             
-            # Génération de questions de suivi
-            follow_up_questions = await self._generate_follow_up_questions(
+            # Questions de suivi et recommandations (tables statiques, sans I/O)
+            follow_up_questions = self._generate_follow_up_questions(
                 content, adapted_response, security_alert
             )
-            
-            # Génération de recommandations
-            recommendations = await self._generate_recommendations(
-                security_alert, detected_urgency
-            )
+            recommendations = self._generate_recommendations(security_alert, detected_urgency)
             
             # Création de la réponse
             response = Response(
@@ -206,19 +268,21 @@ class CommunicationInterface:
             )
             
             # Sauvegarde de la réponse
-            await self._save_response(response)
+            self._save_response(response)
             
-            # Gestion de l'escalade si nécessaire
-            if detected_urgency in [UrgencyLevel.HIGH, UrgencyLevel.CRITICAL]:
-                await self._handle_escalation(response, message)
+            # Gestion de l'escalade si nécessaire, en tâche de fond: la réponse n'en dépend pas
+            if detected_urgency in _ESCALATION_URGENCIES:
+                task = asyncio.create_task(self._handle_escalation(response, message))
+                self._bg_tasks.add(task)
+                task.add_done_callback(self._bg_tasks.discard)
             
             # Mise à jour de la session
-            await self._update_session(session_id, message, response)
+            self._update_session(session_id, message, response, now)
             
             return response
             
         except Exception as e:
-            logger.error(f"Erreur lors du traitement du message: {e}")
+            logger.error("Erreur lors du traitement du message: {}", e)
             
             # Réponse d'erreur
             error_response = Response(
@@ -234,10 +298,10 @@ class CommunicationInterface:
                 follow_up_questions=[]
             )
             
-            await self._save_response(error_response)
+            self._save_response(error_response)
             return error_response
     
-    async def _adapt_response(
+    def _adapt_response(
         self,
         ai_response: str,
         security_alert: Optional[SecurityAlert],
@@ -250,26 +314,20 @@ class CommunicationInterface:
         detected_urgency = original_urgency
         
         if security_alert:
-            severity_mapping = {
-                "critical": UrgencyLevel.CRITICAL,
-                "high": UrgencyLevel.HIGH,
-                "medium": UrgencyLevel.MEDIUM,
-                "low": UrgencyLevel.LOW
-            }
-            detected_urgency = severity_mapping.get(
+            detected_urgency = _URGENCY_BY_SEVERITY.get(
                 security_alert.severity, original_urgency
             )
         
         # Adaptation du contenu selon l'urgence
-        if detected_urgency == UrgencyLevel.CRITICAL:
+        if detected_urgency is UrgencyLevel.CRITICAL:
             adapted_response = f"🚨 **ALERTE CRITIQUE** 🚨\n\n{ai_response}\n\n" \
                              f"**ACTION IMMÉDIATE REQUISE** - Cette situation nécessite une intervention urgente."
                              
-        elif detected_urgency == UrgencyLevel.HIGH:
+        elif detected_urgency is UrgencyLevel.HIGH:
             adapted_response = f"⚠️ **ALERTE ÉLEVÉE** ⚠️\n\n{ai_response}\n\n" \
                              f"Surveillance renforcée recommandée."
                              
-        elif mode == CommunicationMode.VOICE:
+        elif mode is CommunicationMode.VOICE:
             # Adaptation pour la communication vocale
             adapted_response = self._adapt_for_voice(ai_response)
             
@@ -280,19 +338,10 @@ class CommunicationInterface:
     
     def _adapt_for_voice(self, text: str) -> str:
         """Adaptation du texte pour la communication vocale"""
-        # Simplification pour la synthèse vocale
-        adapted = text.replace("🚨", "ALERTE")
-        adapted = adapted.replace("⚠️", "ATTENTION")
-        adapted = adapted.replace("ℹ️", "INFORMATION")
-        
-        # Ajout de pauses naturelles
-        adapted = adapted.replace(". ", ". [pause] ")
-        adapted = adapted.replace("? ", "? [pause] ")
-        adapted = adapted.replace("! ", "! [pause] ")
-        
-        return adapted
+        # Simplification des symboles et pauses naturelles, en un seul parcours du texte
+        return _VOICE_PATTERN.sub(lambda match: _VOICE_SUBSTITUTIONS[match.group(0)], text)
     
-    async def _generate_follow_up_questions(
+    def _generate_follow_up_questions(
         self,
         original_message: str,
         response: str,
@@ -304,41 +353,28 @@ class CommunicationInterface:
         
         # Questions basées sur le type d'alerte
         if security_alert:
-            if security_alert.severity in ["high", "critical"]:
-                questions.extend([
-                    "Avez-vous observé d'autres comportements suspects récemment ?",
-                    "Quels systèmes pourraient être affectés ?",
-                    "Disposez-vous de logs additionnels pour l'analyse ?"
-                ])
+            if security_alert.severity in _SERIOUS_SEVERITIES:
+                questions.extend(_SERIOUS_ALERT_QUESTIONS)
             
-            if "malware" in security_alert.category:
-                questions.extend([
-                    "Sur quels systèmes ce fichier a-t-il été détecté ?",
-                    "Y a-t-il eu des modifications récentes sur ces machines ?"
-                ])
+            for category, category_questions in _ALERT_CATEGORY_QUESTIONS:
+                if category in security_alert.category:
+                    questions.extend(category_questions)
             
-            if "network" in security_alert.category:
-                questions.extend([
-                    "Avez-vous noté des ralentissements réseau ?",
-                    "D'autres adresses IP suspectes ont-elles été observées ?"
-                ])
+            # Limite déjà atteinte: inutile d'examiner le message
+            if len(questions) >= 3:
+                return questions[:3]
         
         # Questions contextuelles basées sur le message original
         message_lower = original_message.lower()
         
-        if "analyse" in message_lower:
-            questions.append("Souhaitez-vous une analyse plus détaillée ?")
-        
-        if "protection" in message_lower:
-            questions.append("Voulez-vous que je vous guide dans la mise en place des protections ?")
-        
-        if "incident" in message_lower:
-            questions.append("Faut-il documenter cet incident dans le système de gestion ?")
+        for keyword, question in _MESSAGE_KEYWORD_QUESTIONS:
+            if keyword in message_lower:
+                questions.append(question)
         
         # Limitation du nombre de questions
         return questions[:3]
     
-    async def _generate_recommendations(
+    def _generate_recommendations(
         self,
         security_alert: Optional[SecurityAlert],
         urgency: UrgencyLevel
@@ -346,197 +382,207 @@ class CommunicationInterface:
         """Génération de recommandations adaptées"""
         
         recommendations = []
+        seen = set()
+        
+        def add(items: Sequence[str]) -> bool:
+            """Ajout sans doublon; retourne True une fois la limite atteinte"""
+            for item in items:
+                if item not in seen:
+                    seen.add(item)
+                    recommendations.append(item)
+                    if len(recommendations) == 5:
+                        return True
+            return False
         
         # Recommandations basées sur l'urgence
-        if urgency == UrgencyLevel.CRITICAL:
-            recommendations.extend([
-                "Isoler immédiatement les systèmes affectés",
-                "Activer la cellule de crise",
-                "Documenter toutes les actions entreprises",
-                "Préparer la communication de crise"
-            ])
-        
-        elif urgency == UrgencyLevel.HIGH:
-            recommendations.extend([
-                "Renforcer la surveillance",
-                "Vérifier l'intégrité des sauvegardes",
-                "Informer l'équipe de sécurité",
-                "Préparer un plan de réponse"
-            ])
+        add(_URGENCY_RECOMMENDATIONS.get(urgency, ()))
         
         # Recommandations spécifiques aux alertes
         if security_alert and security_alert.recommendations:
-            recommendations.extend(security_alert.recommendations)
+            if add(security_alert.recommendations):
+                return recommendations
         
         # Recommandations générales
-        recommendations.extend([
-            "Maintenir une communication régulière",
-            "Documenter les observations",
-            "Suivre les procédures établies"
-        ])
-        
-        # Suppression des doublons et limitation
-        return list(dict.fromkeys(recommendations))[:5]
+        add(_GENERAL_RECOMMENDATIONS)
+        
+        return recommendations
     
-    async def _save_message(self, message: Message):
+    def _save_message(self, message: Message):
         """Sauvegarde d'un message"""
         session_id = message.session_id
         
         if session_id not in self.message_history:
-            self.message_history[session_id] = []
+            self.message_history[session_id] = deque(maxlen=config.max_conversation_history)
+        
+        history = self.message_history[session_id]
         
-        self.message_history[session_id].append(message)
+        # Historique plein: le plus ancien message va être évincé, retrait de l'index
+        if len(history) == history.maxlen:
+            self.message_to_session.pop(history[0].message_id, None)
         
-        # Limitation de l'historique
-        if len(self.message_history[session_id]) > config.max_conversation_history:
-            self.message_history[session_id] = self.message_history[session_id][-config.max_conversation_history:]
+        history.append(message)
+        self.message_to_session[message.message_id] = session_id
+        
+        # Chaque message reçu compte, y compris ceux dont le traitement échoue
+        session = self._get_or_create_session(session_id, message.user_id, message.timestamp)
+        session["message_count"] += 1
     
-    async def _save_response(self, response: Response):
+    def _save_response(self, response: Response):
         """Sauvegarde d'une réponse"""
         # Récupération de la session via le message
-        session_id = None
-        for sid, messages in self.message_history.items():
-            if any(msg.message_id == response.message_id for msg in messages):
-                session_id = sid
-                break
+        session_id = self.message_to_session.get(response.message_id)
         
         if session_id:
             if session_id not in self.response_history:
-                self.response_history[session_id] = []
+                self.response_history[session_id] = deque(maxlen=config.max_conversation_history)
             
+            # Historique borné par maxlen: les plus anciennes réponses sont évincées
             self.response_history[session_id].append(response)
             
-            # Limitation de l'historique
-            if len(self.response_history[session_id]) > config.max_conversation_history:
-                self.response_history[session_id] = self.response_history[session_id][-config.max_conversation_history:]
+            # Réponses d'erreur comprises: seules les réponses produites sont comptées
+            session = self.active_sessions.get(session_id)
+            if session is not None:
+                session["response_count"] += 1
     
-    async def _update_session(self, session_id: str, message: Message, response: Response):
-        """Mise à jour des informations de session"""
-        
-        if session_id not in self.active_sessions:
-            self.active_sessions[session_id] = {
-                "created_at": datetime.utcnow(),
-                "user_id": message.user_id,
+    def _get_or_create_session(self, session_id: str, user_id: str, now: datetime) -> Dict[str, Any]:
+        """Récupération ou création des informations de session"""
+        session = self.active_sessions.get(session_id)
+        
+        if session is None:
+            session = self.active_sessions[session_id] = {
+                "created_at": now,
+                "user_id": user_id,
                 "message_count": 0,
-                "last_activity": datetime.utcnow(),
+                "response_count": 0,
+                "last_activity": now,
                 "current_topic": None,
                 "urgency_level": UrgencyLevel.LOW,
-                "active_alerts": []
+                "active_alerts": deque(maxlen=10),  # 10 alertes actives au plus
+                "topic_counts": Counter()
             }
+            self.user_sessions[user_id].add(session_id)
         
-        session = self.active_sessions[session_id]
-        session["message_count"] += 1
-        session["last_activity"] = datetime.utcnow()
-        session["urgency_level"] = max(session["urgency_level"], response.urgency, key=lambda x: x.value)
+        return session
+    
+    def _update_session(
+        self,
+        session_id: str,
+        message: Message,
+        response: Response,
+        now: Optional[datetime] = None
+    ):
+        """Mise à jour des informations de session"""
+        if now is None:
+            now = datetime.utcnow()
+        
+        session = self._get_or_create_session(session_id, message.user_id, now)
+        session["last_activity"] = now
+        session["urgency_level"] = max(session["urgency_level"], response.urgency, key=_URGENCY_RANK.__getitem__)
         
         # Gestion des alertes actives
         if response.security_alert:
+            # Alertes actives bornées par maxlen: les plus anciennes sont évincées
             session["active_alerts"].append(response.security_alert)
-            
-            # Limitation des alertes actives
-            if len(session["active_alerts"]) > 10:
-                session["active_alerts"] = session["active_alerts"][-10:]
+            session["topic_counts"][response.security_alert.category] += 1
     
     async def _handle_escalation(self, response: Response, message: Message):
         """Gestion de l'escalade des alertes"""
         
-        urgency = response.urgency.value
-        handler = self.escalation_handlers.get(urgency)
+        urgency = response.urgency
         
-        if handler:
-            await handler(response, message)
+        # Exécutée en tâche de fond: les erreurs sont journalisées ici
+        try:
+            if urgency is UrgencyLevel.CRITICAL:
+                await self._handle_critical_escalation(response, message)
+            elif urgency is UrgencyLevel.HIGH:
+                await self._handle_high_escalation(response, message)
+            elif urgency is UrgencyLevel.MEDIUM:
+                await self._handle_medium_escalation(response, message)
+            else:
+                await self._handle_low_escalation(response, message)
+        except Exception as e:
+            logger.error("Erreur lors de l'escalade: {}", e)
     
     async def _handle_critical_escalation(self, response: Response, message: Message):
         """Escalade critique - notification immédiate"""
-        logger.critical(f"ESCALADE CRITIQUE: Session {message.session_id}")
+        logger.critical("ESCALADE CRITIQUE: Session {}", message.session_id)
         
         # En production: notification SMS, email, appel automatique
-        escalation_data = {
-            "level": "CRITICAL",
-            "session_id": message.session_id,
-            "user_id": message.user_id,
-            "alert": asdict(response.security_alert) if response.security_alert else None,
-            "timestamp": datetime.utcnow(),
-            "automatic_actions": [
-                "Équipe de crise notifiée",
-                "Procédures d'urgence activées",
-                "Surveillance continue établie"
-            ]
-        }
-        
-        # Simulation de notification
-        logger.warning(f"Notification d'escalade critique envoyée: {escalation_data}")
+        # Simulation de notification; les données ne sont construites que si le niveau est actif
+        logger.opt(lazy=True).warning(
+            "Notification d'escalade critique envoyée: {}",
+            lambda: {
+                "level": "CRITICAL",
+                "session_id": message.session_id,
+                "user_id": message.user_id,
+                "alert": asdict(response.security_alert) if response.security_alert else None,
+                "timestamp": datetime.utcnow(),
+                "automatic_actions": [
+                    "Équipe de crise notifiée",
+                    "Procédures d'urgence activées",
+                    "Surveillance continue établie"
+                ]
+            }
+        )
     
     async def _handle_high_escalation(self, response: Response, message: Message):
         """Escalade élevée - notification prioritaire"""
-        logger.warning(f"ESCALADE ÉLEVÉE: Session {message.session_id}")
-        
-        escalation_data = {
-            "level": "HIGH",
-            "session_id": message.session_id,
-            "user_id": message.user_id,
-            "alert": asdict(response.security_alert) if response.security_alert else None,
-            "timestamp": datetime.utcnow()
-        }
-        
-        # Simulation de notification
-        logger.info(f"Notification d'escalade élevée envoyée: {escalation_data}")
+        logger.warning("ESCALADE ÉLEVÉE: Session {}", message.session_id)
+        
+        # Simulation de notification; les données ne sont construites que si le niveau est actif
+        logger.opt(lazy=True).info(
+            "Notification d'escalade élevée envoyée: {}",
+            lambda: {
+                "level": "HIGH",
+                "session_id": message.session_id,
+                "user_id": message.user_id,
+                "alert": asdict(response.security_alert) if response.security_alert else None,
+                "timestamp": datetime.utcnow()
+            }
+        )
     
     async def _handle_medium_escalation(self, response: Response, message: Message):
         """Escalade modérée - notification standard"""
-        logger.info(f"Escalade modérée: Session {message.session_id}")
+        logger.info("Escalade modérée: Session {}", message.session_id)
     
     async def _handle_low_escalation(self, response: Response, message: Message):
         """Escalade faible - logging seulement"""
-        logger.debug(f"Escalade faible: Session {message.session_id}")
+        logger.debug("Escalade faible: Session {}", message.session_id)
     
-    async def get_session_summary(self, session_id: str) -> Dict[str, Any]:
+    def get_session_summary(self, session_id: str) -> Dict[str, Any]:
         """Génération d'un résumé de session"""
         
         if session_id not in self.active_sessions:
             return {"error": "Session non trouvée"}
         
         session = self.active_sessions[session_id]
-        messages = self.message_history.get(session_id, [])
-        responses = self.response_history.get(session_id, [])
         
-        # Calcul de statistiques
-        total_messages = len(messages)
-        total_responses = len(responses)
+        # Statistiques tenues à jour dans _update_session, sans relire l'historique
         active_alerts = len(session["active_alerts"])
-        
-        # Analyse des topics
-        topics = {}
-        for response in responses:
-            if response.security_alert:
-                category = response.security_alert.category
-                topics[category] = topics.get(category, 0) + 1
+        now = datetime.utcnow()
         
         return {
             "session_id": session_id,
             "user_id": session["user_id"],
             "created_at": session["created_at"],
-            "duration": (datetime.utcnow() - session["created_at"]).total_seconds(),
-            "message_count": total_messages,
-            "response_count": total_responses,
+            "duration": (now - session["created_at"]).total_seconds(),
+            "message_count": session["message_count"],
+            "response_count": session["response_count"],
             "urgency_level": session["urgency_level"].value,
             "active_alerts": active_alerts,
-            "main_topics": sorted(topics.items(), key=lambda x: x[1], reverse=True)[:3],
+            "main_topics": session["topic_counts"].most_common(3),
             "last_activity": session["last_activity"],
-            "status": "active" if session["last_activity"] > datetime.utcnow() - timedelta(minutes=30) else "inactive"
+            "status": "active" if session["last_activity"] > now - _SESSION_ACTIVE_WINDOW else "inactive"
         }
     
-    async def get_user_sessions(self, user_id: str) -> List[Dict[str, Any]]:
+    def get_user_sessions(self, user_id: str) -> List[Dict[str, Any]]:
         """Récupération des sessions d'un utilisateur"""
         
-        user_sessions = []
+        # Index utilisateur -> sessions: pas de parcours de toutes les sessions actives
+        session_ids = self.user_sessions.get(user_id, ())
+        user_sessions = [self.get_session_summary(session_id) for session_id in session_ids]
         
-        for session_id, session in self.active_sessions.items():
-            if session["user_id"] == user_id:
-                summary = await self.get_session_summary(session_id)
-                user_sessions.append(summary)
-        
-        return sorted(user_sessions, key=lambda x: x["last_activity"], reverse=True)
+        return sorted(user_sessions, key=itemgetter("last_activity"), reverse=True)
     
     async def close_session(self, session_id: str) -> bool:
         """Fermeture d'une session"""
@@ -549,7 +595,18 @@ class CommunicationInterface:
             # Nettoyage
             del self.active_sessions[session_id]
             
-            logger.info(f"Session {session_id} fermée")
+            user_session_ids = self.user_sessions.get(session["user_id"])
+            if user_session_ids is not None:
+                user_session_ids.discard(session_id)
+                if not user_session_ids:
+                    del self.user_sessions[session["user_id"]]
+            
+            # Historiques et index message -> session de la session fermée
+            for message in self.message_history.pop(session_id, ()):
+                self.message_to_session.pop(message.message_id, None)
+            self.response_history.pop(session_id, None)
+            
+            logger.info("Session {} fermée", session_id)
             return True
         
         return False
\ No newline at end of file
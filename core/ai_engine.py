@@ -5,31 +5,43 @@ Moteur IA principal pour CyberSec AI Assistant
 import asyncio
 import json
 import re
-from typing import Dict, List, Optional, Tuple, Any
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
-import torch
-from transformers import (
-    AutoModelForCausalLM, 
-    AutoTokenizer, 
-    pipeline,
-    GPT2LMHeadModel,
-    GPT2Tokenizer
-)
+from functools import lru_cache
+from operator import itemgetter
 from loguru import logger
-import spacy
 from textblob import TextBlob
 from langdetect import detect
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from .config import config
 
+# Sévérités donnant lieu à une alerte de sécurité
+_ALERT_SEVERITIES = frozenset({"high", "critical"})
+
+# Messages courts sans contenu de sécurité (salutations, acquittements)
+_TRIVIAL_MESSAGE_MAX_LENGTH = 16
+_TRIVIAL_MESSAGE_PATTERN = re.compile(r"(ok|oui|non|merci|bonjour|salut|\?+)[\s!.]*")
+
+# Longueur maximale des messages dont l'intention est mémorisée
+_INTENT_CACHE_MAX_LENGTH = 64
+
 
 @dataclass
 class ConversationContext:
     """Contexte de conversation avec l'utilisateur"""
     user_id: str
     session_id: str
-    conversation_history: List[Dict[str, Any]]
+    conversation_history: Deque[Dict[str, Any]]
     user_expertise_level: str  # novice, intermediate, expert
     preferred_language: str
     current_topic: Optional[str] = None
@@ -74,9 +86,20 @@ class CyberSecAI:
         self.tokenizer = None
         self.nlp = None
         self.security_classifier = None
+        # Modèle et tokenizer partagés, non sûrs entre threads: une génération à la fois
+        self.generation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cybersec-generation")
         self.conversation_contexts: Dict[str, ConversationContext] = {}
         self.threat_keywords = self._load_threat_keywords()
+        self.ioc_patterns = self._load_ioc_patterns()
+        self.intent_keywords = self._load_intent_keywords()
+        self.intent_automaton = self._build_intent_automaton()
+        self.intent_pattern, self.intent_by_keyword = self._compile_intent_pattern()
+        self.intent_matcher = self._build_intent_matcher()
+        # Requêtes courtes souvent répétées ("aide", "statut"...): intentions mémorisées.
+        # Le matcher ne référence pas le moteur: pas de cycle via le cache
+        self.intent_cache = lru_cache(maxsize=2048)(self.intent_matcher)
         self.response_templates = self._load_response_templates()
+        self.fallback_responses = self._load_fallback_responses()
         
     async def initialize(self):
         """Initialisation asynchrone du moteur IA"""
@@ -101,6 +124,10 @@ class CyberSecAI:
     async def _load_language_model(self):
         """Chargement du modèle de langage pour la génération de réponses"""
         try:
+            # Imports lourds différés au chargement effectif du modèle
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+            
             model_name = config.model_name
             device = config.model_device
             
@@ -125,6 +152,8 @@ class CyberSecAI:
     
     async def _load_nlp_model(self):
         """Chargement du modèle NLP pour l'analyse linguistique"""
+        import spacy
+        
         try:
             logger.info("Chargement du modèle spaCy...")
             self.nlp = spacy.load("en_core_web_sm")
@@ -136,6 +165,8 @@ class CyberSecAI:
     async def _initialize_security_classifier(self):
         """Initialisation du classificateur de menaces de sécurité"""
         try:
+            from transformers import pipeline
+            
             self.security_classifier = pipeline(
                 "text-classification",
                 model="unitary/toxic-bert",
@@ -166,6 +197,52 @@ class CyberSecAI:
             ]
         }
     
+    def _load_ioc_patterns(self) -> List["re.Pattern[str]"]:
+        """Patterns compilés d'extraction d'indicateurs de compromission"""
+        return [
+            # IPs
+            re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'),
+            # Domaines
+            re.compile(r'\b[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.([a-zA-Z]{2,})\b'),
+            # Hashes MD5/SHA1/SHA256
+            re.compile(r'\b[a-fA-F0-9]{32,64}\b'),
+            # URLs
+            re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+'),
+        ]
+    
+    def _load_intent_keywords(self) -> Dict[str, List[str]]:
+        """Mots-clés d'intention, par ordre de priorité de classification"""
+        return {
+            "analysis_request": ["analyser", "analyse", "examiner", "investigation"],
+            "explanation_request": ["comment", "expliquer", "qu'est-ce que"],
+            "protection_advice": ["protéger", "sécuriser", "défendre"],
+            "incident_report": ["alerte", "incident", "compromis", "attaque"]
+        }
+    
+    def _build_intent_automaton(self):
+        """Automate Aho-Corasick des mots-clés d'intention (None si pyahocorasick est absent)"""
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for priority, (intent, keywords) in enumerate(self.intent_keywords.items()):
+            for keyword in keywords:
+                automaton.add_word(keyword, (priority, intent))
+        automaton.make_automaton()
+        return automaton
+    
+    def _compile_intent_pattern(self) -> Tuple[re.Pattern, Dict[str, Tuple[int, str]]]:
+        """Alternative unique des mots-clés d'intention (repli sans pyahocorasick)"""
+        intent_by_keyword = {}
+        for priority, (intent, keywords) in enumerate(self.intent_keywords.items()):
+            for keyword in keywords:
+                intent_by_keyword.setdefault(keyword, (priority, intent))
+        
+        # Lookahead : une correspondance possible à chaque position, y compris
+        # pour des mots-clés qui se chevauchent ; les plus longs sont essayés en premier
+        alternation = "|".join(map(re.escape, sorted(intent_by_keyword, key=len, reverse=True)))
+        return re.compile(f"(?=({alternation}))"), intent_by_keyword
+    
     def _load_response_templates(self) -> Dict[str, Dict[str, str]]:
         """Modèles de réponse adaptés au niveau d'expertise"""
         return {
@@ -186,6 +263,21 @@ class CyberSecAI:
             }
         }
     
+    def _load_fallback_responses(self) -> Dict[str, Dict[str, str]]:
+        """Réponses de fallback par intention et niveau d'expertise"""
+        return {
+            "analysis_request": {
+                "novice": "Je peux vous aider à analyser cette situation de sécurité. Pouvez-vous me donner plus de détails ?",
+                "intermediate": "Pour une analyse approfondie, j'aurais besoin de plus d'informations sur le contexte.",
+                "expert": "Analyse en cours. Veuillez partager les logs ou IoCs pour une évaluation détaillée."
+            },
+            "explanation_request": {
+                "novice": "Je serai ravi de vous expliquer ce concept de sécurité de manière simple.",
+                "intermediate": "Voici une explication technique de ce sujet de cybersécurité.",
+                "expert": "Analysons ensemble les aspects techniques avancés de cette question."
+            }
+        }
+    
     async def process_message(
         self, 
         message: str, 
@@ -207,19 +299,32 @@ class CyberSecAI:
         """
         try:
             # Récupération ou création du contexte de conversation
-            conv_context = await self._get_or_create_context(user_id, session_id)
+            conv_context = self._get_or_create_context(user_id, session_id)
             
-            # Analyse linguistique du message
-            linguistic_analysis = await self._analyze_message_linguistics(message)
+            # Normalisation unique du message, partagée par les analyses par mots-clés
+            message_lower = message.lower()
+            
+            # Message trivial: ni analyse linguistique, ni entités, ni analyse de menaces
+            trivial = (
+                len(message) <= _TRIVIAL_MESSAGE_MAX_LENGTH
+                and _TRIVIAL_MESSAGE_PATTERN.fullmatch(message_lower.strip()) is not None
+            )
             
-            # Détection d'entités de sécurité
-            security_entities = await self._extract_security_entities(message)
+            if trivial:
+                linguistic_analysis = {"language": "unknown", "sentiment": {"polarity": 0, "subjectivity": 0}}
+                security_entities = {category: [] for category in self.threat_keywords}
+                security_entities["iocs"] = []
+            else:
+                # Analyse linguistique soumise au pool de threads, entités extraites pendant ce temps
+                linguistic_future = self._analyze_message_linguistics(message)
+                security_entities = self._extract_security_entities(message, message_lower)
+                linguistic_analysis = await linguistic_future
             
             # Classification de l'intent
-            intent = await self._classify_intent(message, security_entities)
+            intent = self._classify_intent(message, security_entities, message_lower)
             
             # Détection de menaces potentielles
-            threat_analysis = await self._analyze_threats(message, security_entities)
+            threat_analysis = None if trivial else self._analyze_threats(message, security_entities)
             
             # Génération de la réponse adaptée
             response = await self._generate_adaptive_response(
@@ -227,14 +332,14 @@ class CyberSecAI:
             )
             
             # Mise à jour du contexte de conversation
-            await self._update_conversation_context(
+            self._update_conversation_context(
                 conv_context, message, response, security_entities
             )
             
             # Création d'alerte si nécessaire
             alert = None
-            if threat_analysis.get("severity", "low") in ["high", "critical"]:
-                alert = await self._create_security_alert(threat_analysis, security_entities)
+            if threat_analysis and threat_analysis.get("severity", "low") in _ALERT_SEVERITIES:
+                alert = self._create_security_alert(threat_analysis, security_entities)
             
             return response, alert
             
@@ -242,7 +347,7 @@ class CyberSecAI:
             logger.error(f"Erreur lors du traitement du message: {e}")
             return self._get_error_response(), None
     
-    async def _get_or_create_context(self, user_id: str, session_id: str) -> ConversationContext:
+    def _get_or_create_context(self, user_id: str, session_id: str) -> ConversationContext:
         """Récupération ou création du contexte de conversation"""
         context_key = f"{user_id}:{session_id}"
         
@@ -253,15 +358,20 @@ class CyberSecAI:
             self.conversation_contexts[context_key] = ConversationContext(
                 user_id=user_id,
                 session_id=session_id,
-                conversation_history=[],
+                conversation_history=deque(maxlen=config.max_conversation_history),
                 user_expertise_level=expertise_level,
                 preferred_language="fr"
             )
         
         return self.conversation_contexts[context_key]
     
-    async def _analyze_message_linguistics(self, message: str) -> Dict[str, Any]:
-        """Analyse linguistique approfondie du message"""
+    def _analyze_message_linguistics(self, message: str) -> "asyncio.Future[Dict[str, Any]]":
+        """Analyse linguistique approfondie du message, démarrée immédiatement"""
+        # spaCy, TextBlob et langdetect sont bloquants: exécution hors de la boucle d'événements
+        return asyncio.get_running_loop().run_in_executor(None, self._run_linguistic_analysis, message)
+    
+    def _run_linguistic_analysis(self, message: str) -> Dict[str, Any]:
+        """Analyse linguistique synchrone (exécutée dans un thread)"""
         try:
             # Détection de la langue
             detected_language = detect(message)
@@ -295,11 +405,16 @@ class CyberSecAI:
             logger.warning(f"Erreur lors de l'analyse linguistique: {e}")
             return {"language": "unknown", "sentiment": {"polarity": 0, "subjectivity": 0}}
     
-    async def _extract_security_entities(self, message: str) -> Dict[str, List[str]]:
+    def _extract_security_entities(
+        self,
+        message: str,
+        message_lower: Optional[str] = None
+    ) -> Dict[str, List[str]]:
         """Extraction d'entités liées à la cybersécurité"""
         entities = {category: [] for category in self.threat_keywords.keys()}
         
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
         
         for category, keywords in self.threat_keywords.items():
             for keyword in keywords:
@@ -307,52 +422,69 @@ class CyberSecAI:
                     entities[category].append(keyword)
         
         # Extraction d'IoCs (Indicators of Compromise)
-        iocs = await self._extract_iocs(message)
+        iocs = self._extract_iocs(message)
         entities["iocs"] = iocs
         
         return entities
     
-    async def _extract_iocs(self, text: str) -> List[str]:
+    def _extract_iocs(self, text: str) -> List[str]:
         """Extraction d'indicateurs de compromission"""
         iocs = []
         
-        # Regex pour IPs
-        ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-        iocs.extend(re.findall(ip_pattern, text))
-        
-        # Regex pour domaines
-        domain_pattern = r'\b[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.([a-zA-Z]{2,})\b'
-        iocs.extend(re.findall(domain_pattern, text))
+        # finditer + group(0): la correspondance complète, sans matérialiser les groupes
+        for pattern in self.ioc_patterns:
+            iocs.extend(match.group(0) for match in pattern.finditer(text))
         
-        # Regex pour hashes MD5/SHA1/SHA256
-        hash_pattern = r'\b[a-fA-F0-9]{32,64}\b'
-        iocs.extend(re.findall(hash_pattern, text))
-        
-        # Regex pour URLs
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        iocs.extend(re.findall(url_pattern, text))
-        
-        return list(set(iocs))  # Suppression des doublons
+        return list(dict.fromkeys(iocs))  # Suppression des doublons, ordre conservé
     
-    async def _classify_intent(self, message: str, security_entities: Dict[str, List[str]]) -> str:
+    def _classify_intent(
+        self,
+        message: str,
+        security_entities: Dict[str, List[str]],
+        message_lower: Optional[str] = None
+    ) -> str:
         """Classification de l'intention du message"""
-        message_lower = message.lower()
-        
-        # Classification basée sur des mots-clés (à améliorer avec ML)
-        if any(word in message_lower for word in ["analyser", "analyse", "examiner", "investigation"]):
-            return "analysis_request"
-        elif any(word in message_lower for word in ["comment", "expliquer", "qu'est-ce que"]):
-            return "explanation_request"
-        elif any(word in message_lower for word in ["protéger", "sécuriser", "défendre"]):
-            return "protection_advice"
-        elif any(word in message_lower for word in ["alerte", "incident", "compromis", "attaque"]):
-            return "incident_report"
+        if message_lower is None:
+            message_lower = message.lower()
+        
+        # Classification basée sur des mots-clés (à améliorer avec ML);
+        # seuls les messages courts sont mémorisés, pour borner la taille du cache
+        message_key = message_lower.strip()
+        if len(message_key) <= _INTENT_CACHE_MAX_LENGTH:
+            keyword_intent = self.intent_cache(message_key)
+        else:
+            keyword_intent = self.intent_matcher(message_key)
+        if keyword_intent:
+            return keyword_intent
         elif sum(len(entities) for entities in security_entities.values()) > 0:
             return "security_consultation"
         else:
             return "general_conversation"
     
-    async def _analyze_threats(self, message: str, security_entities: Dict[str, List[str]]) -> Dict[str, Any]:
+    def _build_intent_matcher(self) -> Callable[[str], Optional[str]]:
+        """Fonction de correspondance des intentions, liée aux seuls index de mots-clés"""
+        intent_automaton = self.intent_automaton
+        intent_pattern = self.intent_pattern
+        intent_by_keyword = self.intent_by_keyword
+        
+        def match_intent_keywords(message_lower: str) -> Optional[str]:
+            """Intention de plus haute priorité dont un mot-clé apparaît dans le message"""
+            
+            if intent_automaton is not None:
+                # Un seul parcours du message pour l'ensemble des mots-clés
+                best = min((value for _, value in intent_automaton.iter(message_lower)), default=None)
+                return best[1] if best else None
+            
+            # Parcours unique du message par le moteur re
+            best = min(
+                (intent_by_keyword[match.group(1)] for match in intent_pattern.finditer(message_lower)),
+                default=None
+            )
+            return best[1] if best else None
+        
+        return match_intent_keywords
+    
+    def _analyze_threats(self, message: str, security_entities: Dict[str, List[str]]) -> Dict[str, Any]:
         """Analyse des menaces potentielles dans le message"""
         threat_score = 0
         threat_categories = []
@@ -399,31 +531,20 @@ class CyberSecAI:
         template = self.response_templates[context.user_expertise_level]
         
         # Construction du prompt pour le modèle
-        prompt = await self._build_prompt(
+        prompt = self._build_prompt(
             message, context, intent, security_entities, template
         )
         
         # Génération avec le modèle de langage
         try:
-            inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
-                    max_length=inputs.shape[1] + config.max_response_length,
-                    num_return_sequences=1,
-                    temperature=config.temperature,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id
-                )
-            
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Nettoyage de la réponse
-            response = response[len(prompt):].strip()
+            # Inférence bloquante (torch): exécution hors de la boucle d'événements,
+            # sérialisée sur le thread dédié à la génération
+            response = await asyncio.get_running_loop().run_in_executor(
+                self.generation_executor, self._generate_text, prompt
+            )
             
             # Post-traitement adaptatif
-            response = await self._post_process_response(response, context, security_entities)
+            response = self._post_process_response(response, context, security_entities)
             
             return response
             
@@ -431,7 +552,28 @@ class CyberSecAI:
             logger.error(f"Erreur lors de la génération: {e}")
             return self._get_fallback_response(intent, context.user_expertise_level)
     
-    async def _build_prompt(
+    def _generate_text(self, prompt: str) -> str:
+        """Génération synchrone d'une suite au prompt (exécutée sur le thread de génération)"""
+        import torch
+        
+        inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
+        
+        with torch.no_grad():
+            outputs = self.model.generate(
+                inputs,
+                max_length=inputs.shape[1] + config.max_response_length,
+                num_return_sequences=1,
+                temperature=config.temperature,
+                do_sample=True,
+                pad_token_id=self.tokenizer.eos_token_id
+            )
+        
+        response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        
+        # Nettoyage de la réponse
+        return response[len(prompt):].strip()
+    
+    def _build_prompt(
         self,
         message: str,
         context: ConversationContext,
@@ -449,9 +591,12 @@ Profondeur technique: {template['technical_depth']}."""
         # Historique récent de conversation
         history = ""
         if context.conversation_history:
-            recent_history = context.conversation_history[-3:]  # 3 derniers échanges
-            for entry in recent_history:
-                history += f"Utilisateur: {entry['user']}\nAssistant: {entry['assistant']}\n"
+            history_length = len(context.conversation_history)
+            recent_history = islice(context.conversation_history, max(history_length - 3, 0), None)  # 3 derniers échanges
+            history = "".join(
+                f"Utilisateur: {entry['user']}\nAssistant: {entry['assistant']}\n"
+                for entry in recent_history
+            )
         
         # Entités de sécurité détectées
         entities_context = ""
@@ -470,7 +615,7 @@ Assistant:"""
         
         return prompt
     
-    async def _post_process_response(
+    def _post_process_response(
         self,
         response: str,
         context: ConversationContext,
@@ -495,7 +640,7 @@ Assistant:"""
         
         return response
     
-    async def _update_conversation_context(
+    def _update_conversation_context(
         self,
         context: ConversationContext,
         user_message: str,
@@ -504,18 +649,14 @@ Assistant:"""
     ):
         """Mise à jour du contexte de conversation"""
         
-        # Ajout à l'historique
+        # Ajout à l'historique (borné par maxlen: les plus anciens échanges sont évincés)
         context.conversation_history.append({
             "user": user_message,
             "assistant": assistant_response,
-            "timestamp": datetime.utcnow(),
+            "timestamp": time.time_ns(),
             "entities": security_entities
         })
         
-        # Limitation de l'historique
-        if len(context.conversation_history) > config.max_conversation_history:
-            context.conversation_history = context.conversation_history[-config.max_conversation_history:]
-        
         # Mise à jour du topic actuel
         if security_entities:
             dominant_category = max(
@@ -525,7 +666,7 @@ Assistant:"""
             if security_entities[dominant_category]:
                 context.current_topic = dominant_category
     
-    async def _create_security_alert(
+    def _create_security_alert(
         self,
         threat_analysis: Dict[str, Any],
         security_entities: Dict[str, List[str]]
@@ -540,7 +681,7 @@ Assistant:"""
             indicators.extend(entities)
         
         # Génération de recommandations
-        recommendations = await self._generate_recommendations(threat_analysis, security_entities)
+        recommendations = self._generate_recommendations(threat_analysis, security_entities)
         
         return SecurityAlert(
             alert_id=alert_id,
@@ -552,7 +693,7 @@ Assistant:"""
             confidence=threat_analysis["confidence"]
         )
     
-    async def _generate_recommendations(
+    def _generate_recommendations(
         self,
         threat_analysis: Dict[str, Any],
         security_entities: Dict[str, List[str]]
@@ -590,21 +731,7 @@ Assistant:"""
     
     def _get_fallback_response(self, intent: str, expertise_level: str) -> str:
         """Réponses de fallback par intention"""
-        
-        fallback_responses = {
-            "analysis_request": {
-                "novice": "Je peux vous aider à analyser cette situation de sécurité. Pouvez-vous me donner plus de détails ?",
-                "intermediate": "Pour une analyse approfondie, j'aurais besoin de plus d'informations sur le contexte.",
-                "expert": "Analyse en cours. Veuillez partager les logs ou IoCs pour une évaluation détaillée."
-            },
-            "explanation_request": {
-                "novice": "Je serai ravi de vous expliquer ce concept de sécurité de manière simple.",
-                "intermediate": "Voici une explication technique de ce sujet de cybersécurité.",
-                "expert": "Analysons ensemble les aspects techniques avancés de cette question."
-            }
-        }
-        
-        return fallback_responses.get(intent, {}).get(
+        return self.fallback_responses.get(intent, {}).get(
             expertise_level,
             "Comment puis-je vous aider avec votre question de cybersécurité ?"
         )
@@ -628,7 +755,7 @@ Assistant:"""
         return {
             "session_id": session_id,
             "message_count": len(context.conversation_history),
-            "main_topics": sorted(topics.items(), key=lambda x: x[1], reverse=True)[:5],
+            "main_topics": sorted(topics.items(), key=itemgetter(1), reverse=True)[:5],
             "expertise_level": context.user_expertise_level,
             "current_topic": context.current_topic,
             "session_duration": (datetime.utcnow() - context.timestamp).total_seconds()
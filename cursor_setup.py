@@ -95,9 +95,9 @@ class CursorSetup:
         
         # Vérification Python
         python_version = sys.version_info
-        if python_version < (3, 8):
+        if python_version < (3, 10):
             print(f"❌ Python {python_version.major}.{python_version.minor} trop ancien")
-            print("📥 Installez Python 3.8+ depuis https://python.org")
+            print("📥 Installez Python 3.10+ depuis https://python.org")
             return False
         
         print(f"✅ Python {python_version.major}.{python_version.minor}.{python_version.micro}")
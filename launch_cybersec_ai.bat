@@ -13,7 +13,7 @@ REM Verification de Python
 python --version >nul 2>&1
 if errorlevel 1 (
     echo [ERREUR] Python n'est pas installe ou non disponible dans le PATH
-    echo Veuillez installer Python 3.8+ depuis https://python.org
+    echo Veuillez installer Python 3.10+ depuis https://python.org
     pause
     exit /b 1
 )
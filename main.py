@@ -33,12 +33,16 @@ def setup_logging():
         "<level>{message}</level>"
     )
     
+    # Les sinks sont alimentés via une file (enqueue): les écritures se font
+    # dans un thread dédié, hors de la boucle d'événements
+    
     # Logger console
     logger.add(
         sys.stderr,
         format=log_format,
         level=config.log_level,
-        colorize=True
+        colorize=True,
+        enqueue=True
     )
     
     # Logger fichier si configuré
@@ -49,7 +53,8 @@ def setup_logging():
             level=config.log_level,
             rotation="10 MB",
             retention="7 days",
-            compression="zip"
+            compression="zip",
+            enqueue=True
         )
 
 
@@ -87,13 +92,13 @@ def check_dependencies():
     for package in required_packages:
         try:
             __import__(package)
-            logger.debug(f"✅ {package} - OK")
+            logger.debug("✅ {} - OK", package)
         except ImportError:
             missing_packages.append(package)
-            logger.error(f"❌ {package} - MANQUANT")
+            logger.error("❌ {} - MANQUANT", package)
     
     if missing_packages:
-        logger.error(f"Packages manquants: {', '.join(missing_packages)}")
+        logger.error("Packages manquants: {}", ", ".join(missing_packages))
         logger.error("Installez les dépendances avec: pip install -r requirements.txt")
         return False
     
@@ -119,7 +124,7 @@ def check_models():
         return True
         
     except Exception as e:
-        logger.error(f"Erreur lors de la vérification des modèles: {e}")
+        logger.error("Erreur lors de la vérification des modèles: {}", e)
         return False
 
 
@@ -127,13 +132,13 @@ def print_system_info():
     """Affichage des informations système"""
     
     logger.info("Configuration système:")
-    logger.info(f"  🖥️  Host: {config.api_host}:{config.api_port}")
-    logger.info(f"  🧠  Modèle IA: {config.model_name}")
-    logger.info(f"  💾  Device: {config.model_device}")
-    logger.info(f"  🌡️  Température: {config.temperature}")
-    logger.info(f"  🔧  Mode debug: {config.debug}")
-    logger.info(f"  👥  Workers: {config.api_workers}")
-    logger.info(f"  📊  Log level: {config.log_level}")
+    logger.info("  🖥️  Host: {}:{}", config.api_host, config.api_port)
+    logger.info("  🧠  Modèle IA: {}", config.model_name)
+    logger.info("  💾  Device: {}", config.model_device)
+    logger.info("  🌡️  Température: {}", config.temperature)
+    logger.info("  🔧  Mode debug: {}", config.debug)
+    logger.info("  👥  Workers: {}", config.api_workers)
+    logger.info("  📊  Log level: {}", config.log_level)
 
 
 async def startup_checks():
@@ -189,19 +194,22 @@ def main():
         "workers": 1 if config.debug else config.api_workers,
         "access_log": True,
         "use_colors": True,
+        # Boucle uvloop et parseur httptools (uvloop n'existe pas sous Windows)
+        "loop": "asyncio" if sys.platform == "win32" else "uvloop",
+        "http": "httptools",
     }
     
     logger.info("🌐 Démarrage du serveur web...")
-    logger.info(f"📍 Interface disponible sur: http://{config.api_host}:{config.api_port}")
-    logger.info(f"📚 Documentation API: http://{config.api_host}:{config.api_port}/docs")
-    logger.info(f"🔧 Statut système: http://{config.api_host}:{config.api_port}/health")
+    logger.info("📍 Interface disponible sur: http://{}:{}", config.api_host, config.api_port)
+    logger.info("📚 Documentation API: http://{}:{}/docs", config.api_host, config.api_port)
+    logger.info("🔧 Statut système: http://{}:{}/health", config.api_host, config.api_port)
     
     try:
         uvicorn.run(**uvicorn_config)
     except KeyboardInterrupt:
         logger.info("🛑 Arrêt demandé par l'utilisateur")
     except Exception as e:
-        logger.error(f"❌ Erreur fatale: {e}")
+        logger.error("❌ Erreur fatale: {}", e)
         sys.exit(1)
     finally:
         logger.info("👋 CyberSec AI Assistant arrêté")
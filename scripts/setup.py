@@ -131,8 +131,8 @@ def check_system_requirements():
     
     # Version Python
     python_version = sys.version_info
-    if python_version < (3, 8):
-        logger.error(f"Python 3.8+ requis, trouvé: {python_version.major}.{python_version.minor}")
+    if python_version < (3, 10):
+        logger.error(f"Python 3.10+ requis, trouvé: {python_version.major}.{python_version.minor}")
         return False
     
     logger.success(f"Version Python OK: {python_version.major}.{python_version.minor}.{python_version.micro}")
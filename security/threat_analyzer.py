@@ -9,18 +9,25 @@ import asyncio
 import hashlib
 import json
 import re
+import secrets
+from functools import lru_cache
+from operator import itemgetter
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.feature_extraction.text import TfidfVectorizer
 from loguru import logger
 import httpx
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 from core.config import config
 
+# Longueur maximale des indicateurs dont l'analyse comportementale est mémorisée
+_BEHAVIOR_CACHE_MAX_LENGTH = 256
+
 
 @dataclass
 class ThreatIndicator:
@@ -64,10 +71,19 @@ class ThreatAnalyzer:
     def __init__(self):
         self.threat_feeds: List[str] = config.threat_feeds
         self.indicators_db: Dict[str, ThreatIndicator] = {}
+        self.indicator_groups: Dict[str, Dict[str, None]] = {}
         self.threat_intelligence: Dict[str, ThreatIntelligence] = {}
         self.anomaly_detector = None
         self.text_vectorizer = None
         self.mitre_mapping = self._load_mitre_mapping()
+        self.severity_weights = {"low": 1, "medium": 3, "high": 5, "critical": 10}
+        self.indicator_type_patterns = self._load_indicator_type_patterns()
+        self.behavior_patterns = self._load_behavior_patterns()
+        self.behavior_database = self._compile_behavior_database()
+        self._behavior_matcher = self._build_behavior_matcher()
+        # Les mêmes indicateurs reviennent souvent (brute force, scans): résultats mémorisés.
+        # Le matcher ne référence pas l'analyseur: pas de cycle via le cache
+        self._cached_behavior_scan = lru_cache(maxsize=4096)(self._behavior_matcher)
         
     async def initialize(self):
         """Initialisation de l'analyseur de menaces"""
@@ -92,6 +108,18 @@ class ThreatAnalyzer:
     async def _initialize_ml_models(self):
         """Initialisation des modèles de machine learning"""
         try:
+            # Accélération Intel oneDAL des estimateurs scikit-learn si disponible
+            # (doit précéder l'import des estimateurs)
+            try:
+                from sklearnex import patch_sklearn
+                patch_sklearn()
+            except ImportError:
+                pass
+            
+            # scikit-learn n'est importé qu'à l'initialisation, pas à l'import du module
+            from sklearn.ensemble import IsolationForest
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            
             # Modèle de détection d'anomalies
             self.anomaly_detector = IsolationForest(
                 contamination=0.1,
@@ -123,7 +151,7 @@ class ThreatAnalyzer:
                     response = await client.get(feed_url)
                     
                     if response.status_code == 200:
-                        await self._parse_threat_feed(feed_url, response.text)
+                        self._parse_threat_feed(feed_url, response.text)
                         logger.success(f"Feed traité: {feed_url}")
                     else:
                         logger.warning(f"Erreur HTTP {response.status_code} pour {feed_url}")
@@ -133,10 +161,13 @@ class ThreatAnalyzer:
                     
         logger.info(f"Mise à jour terminée. {len(self.indicators_db)} indicateurs chargés")
     
-    async def _parse_threat_feed(self, source: str, content: str):
+    def _parse_threat_feed(self, source: str, content: str):
         """Parse d'un feed de threat intelligence"""
         lines = content.strip().split('\n')
         
+        # Horodatage unique pour tous les indicateurs du feed
+        fetched_at = datetime.utcnow()
+        
         for line in lines:
             line = line.strip()
             if not line or line.startswith('#'):
@@ -150,34 +181,45 @@ class ThreatAnalyzer:
                     value=line,
                     confidence=0.8,  # Confiance par défaut pour les feeds publics
                     source=source,
-                    first_seen=datetime.utcnow(),
-                    last_seen=datetime.utcnow(),
+                    first_seen=fetched_at,
+                    last_seen=fetched_at,
                     tags=["threat_feed"],
                     severity="medium"
                 )
                 
-                self.indicators_db[line] = indicator
+                self._store_indicator(indicator)
     
-    def _detect_indicator_type(self, value: str) -> Optional[str]:
-        """Détection automatique du type d'indicateur"""
+    def _store_indicator(self, indicator: ThreatIndicator):
+        """Enregistrement d'un indicateur et mise à jour de l'index de corrélation"""
+        
+        previous = self.indicators_db.get(indicator.value)
+        if previous is not None:
+            previous_key = f"{previous.source}_{previous.severity}"
+            self.indicator_groups.get(previous_key, {}).pop(indicator.value, None)
         
-        # IP Address
-        ip_pattern = r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$'
-        if re.match(ip_pattern, value):
-            return "ip"
+        self.indicators_db[indicator.value] = indicator
         
-        # Domain
-        domain_pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.([a-zA-Z]{2,})$'
-        if re.match(domain_pattern, value):
-            return "domain"
+        # Index par source et sévérité, utilisé par correlate_threats
+        group_key = f"{indicator.source}_{indicator.severity}"
+        self.indicator_groups.setdefault(group_key, {})[indicator.value] = None
+    
+    def _load_indicator_type_patterns(self) -> List[Tuple[str, "re.Pattern[str]"]]:
+        """Patterns compilés de détection du type d'indicateur, par ordre de priorité"""
+        return [
+            ("ip", re.compile(r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$')),
+            ("domain", re.compile(r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.([a-zA-Z]{2,})$')),
+            ("md5", re.compile(r'^[a-fA-F0-9]{32}$')),
+            ("sha1", re.compile(r'^[a-fA-F0-9]{40}$')),
+            ("sha256", re.compile(r'^[a-fA-F0-9]{64}$')),
+        ]
+    
+    def _detect_indicator_type(self, value: str) -> Optional[str]:
+        """Détection automatique du type d'indicateur"""
         
-        # Hash (MD5, SHA1, SHA256)
-        if re.match(r'^[a-fA-F0-9]{32}$', value):
-            return "md5"
-        elif re.match(r'^[a-fA-F0-9]{40}$', value):
-            return "sha1"
-        elif re.match(r'^[a-fA-F0-9]{64}$', value):
-            return "sha256"
+        # IP, domaine et hashes (MD5, SHA1, SHA256)
+        for indicator_type, pattern in self.indicator_type_patterns:
+            if pattern.match(value):
+                return indicator_type
         
         # URL
         if value.startswith(('http://', 'https://')):
@@ -213,6 +255,57 @@ class ThreatAnalyzer:
         self.mitre_techniques = sample_techniques
         logger.success("Base MITRE ATT&CK chargée")
     
+    def _load_behavior_patterns(self) -> List["re.Pattern[str]"]:
+        """Patterns compilés pour l'analyse comportementale des indicateurs"""
+        suspicious_patterns = [
+            r'\.tmp$',  # Fichiers temporaires
+            r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}',  # IPs
+            r'(cmd|powershell|bash)',  # Commandes système
+            r'(download|upload|connect)',  # Actions réseau
+            r'[a-fA-F0-9]{32,64}',  # Hashes
+        ]
+        return [re.compile(pattern, re.IGNORECASE) for pattern in suspicious_patterns]
+    
+    def _compile_behavior_database(self):
+        """Compilation des patterns comportementaux en une base Hyperscan (si disponible)"""
+        if hyperscan is None:
+            return None
+        
+        try:
+            database = hyperscan.Database()
+            database.compile(
+                expressions=[pattern.pattern.encode() for pattern in self.behavior_patterns],
+                ids=list(range(len(self.behavior_patterns))),
+                elements=len(self.behavior_patterns),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(self.behavior_patterns)
+            )
+            return database
+        except Exception as e:
+            logger.warning(f"Base Hyperscan indisponible, utilisation de re: {e}")
+            return None
+    
+    def _build_behavior_matcher(self) -> Callable[[str], Tuple[str, ...]]:
+        """Fonction de correspondance comportementale, liée aux seuls patterns compilés"""
+        behavior_patterns = self.behavior_patterns
+        behavior_database = self.behavior_database
+        
+        def match_behavior_patterns(indicator: str) -> Tuple[str, ...]:
+            """Patterns comportementaux reconnus dans un indicateur"""
+            
+            if behavior_database is None:
+                return tuple(pattern.pattern for pattern in behavior_patterns if pattern.search(indicator))
+            
+            # Un seul parcours de l'indicateur pour l'ensemble des patterns
+            matched_ids = set()
+            
+            def on_match(pattern_id, start, end, flags, context):
+                matched_ids.add(pattern_id)
+            
+            behavior_database.scan(indicator.encode("utf-8"), match_event_handler=on_match)
+            return tuple(behavior_patterns[pattern_id].pattern for pattern_id in sorted(matched_ids))
+        
+        return match_behavior_patterns
+    
     def _load_mitre_mapping(self) -> Dict[str, List[str]]:
         """Mapping de mots-clés vers les techniques MITRE"""
         return {
@@ -248,7 +341,8 @@ class ThreatAnalyzer:
         
         threat_score = 0
         detected_threats = []
-        mitre_techniques = set()
+        # Techniques dédoublonnées dans l'ordre de première apparition (dict ordonné)
+        mitre_techniques: Dict[str, None] = {}
         
         for indicator in indicators:
             # Vérification dans la base d'indicateurs connus
@@ -264,18 +358,17 @@ class ThreatAnalyzer:
                 })
                 
                 # Calcul du score de menace
-                severity_weights = {"low": 1, "medium": 3, "high": 5, "critical": 10}
-                threat_score += severity_weights.get(threat_info.severity, 1) * threat_info.confidence
+                threat_score += self.severity_weights.get(threat_info.severity, 1) * threat_info.confidence
             
             # Analyse comportementale
-            behavioral_analysis = await self._analyze_behavior(indicator)
+            behavioral_analysis = self._analyze_behavior(indicator)
             if behavioral_analysis["suspicious"]:
                 threat_score += behavioral_analysis["score"]
                 detected_threats.append(behavioral_analysis)
             
             # Mapping MITRE ATT&CK
-            techniques = await self._map_to_mitre(indicator)
-            mitre_techniques.update(techniques)
+            techniques = self._map_to_mitre(indicator)
+            mitre_techniques.update(dict.fromkeys(techniques))
         
         # Calcul du score de risque global
         analysis_results["risk_score"] = min(threat_score / len(indicators), 100) if indicators else 0
@@ -283,7 +376,7 @@ class ThreatAnalyzer:
         analysis_results["mitre_techniques"] = list(mitre_techniques)
         
         # Génération de recommandations
-        analysis_results["recommendations"] = await self._generate_recommendations(
+        analysis_results["recommendations"] = self._generate_recommendations(
             analysis_results["risk_score"],
             detected_threats,
             mitre_techniques
@@ -291,25 +384,15 @@ class ThreatAnalyzer:
         
         return analysis_results
     
-    async def _analyze_behavior(self, indicator: str) -> Dict[str, Any]:
+    def _analyze_behavior(self, indicator: str) -> Dict[str, Any]:
         """Analyse comportementale d'un indicateur"""
         
         # Analyse basique (à améliorer avec des modèles ML plus sophistiqués)
-        suspicious_patterns = [
-            r'\.tmp$',  # Fichiers temporaires
-            r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}',  # IPs
-            r'(cmd|powershell|bash)',  # Commandes système
-            r'(download|upload|connect)',  # Actions réseau
-            r'[a-fA-F0-9]{32,64}',  # Hashes
-        ]
-        
-        suspicion_score = 0
-        matched_patterns = []
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, indicator, re.IGNORECASE):
-                suspicion_score += 10
-                matched_patterns.append(pattern)
+        if len(indicator) <= _BEHAVIOR_CACHE_MAX_LENGTH:
+            matched_patterns = list(self._cached_behavior_scan(indicator))
+        else:
+            matched_patterns = list(self._behavior_matcher(indicator))
+        suspicion_score = 10 * len(matched_patterns)
         
         return {
             "indicator": indicator,
@@ -320,7 +403,7 @@ class ThreatAnalyzer:
             "confidence": min(suspicion_score / 50, 1.0)
         }
     
-    async def _map_to_mitre(self, indicator: str) -> List[str]:
+    def _map_to_mitre(self, indicator: str) -> List[str]:
         """Mapping d'un indicateur vers les techniques MITRE ATT&CK"""
         techniques = []
         
@@ -330,13 +413,14 @@ class ThreatAnalyzer:
             if keyword in indicator_lower:
                 techniques.extend(technique_ids)
         
-        return list(set(techniques))
+        # Suppression des doublons, ordre du mapping conservé
+        return list(dict.fromkeys(techniques))
     
-    async def _generate_recommendations(
+    def _generate_recommendations(
         self,
         risk_score: float,
         threats: List[Dict[str, Any]],
-        mitre_techniques: set
+        mitre_techniques: Dict[str, None]
     ) -> List[str]:
         """Génération de recommandations basées sur l'analyse"""
         
@@ -391,15 +475,19 @@ class ThreatAnalyzer:
         # Simulation de corrélation (en production, cela utiliserait une vraie base de données)
         correlated_threats = []
         
-        # Groupe d'indicateurs par source et timeline
+        # Groupe d'indicateurs par source et timeline (index maintenu à l'insertion)
         threat_groups = {}
         
-        for indicator_value, indicator in self.indicators_db.items():
-            if indicator.last_seen >= cutoff_time:
-                group_key = f"{indicator.source}_{indicator.severity}"
-                if group_key not in threat_groups:
-                    threat_groups[group_key] = []
-                threat_groups[group_key].append(indicator)
+        for group_key, indicator_values in self.indicator_groups.items():
+            if len(indicator_values) < 3:  # Le seuil de campagne ne peut pas être atteint
+                continue
+            
+            recent = [
+                self.indicators_db[value] for value in indicator_values
+                if self.indicators_db[value].last_seen >= cutoff_time
+            ]
+            if recent:
+                threat_groups[group_key] = recent
         
         # Analyse des groupes pour détecter des campagnes
         for group_key, indicators in threat_groups.items():
@@ -415,7 +503,7 @@ class ThreatAnalyzer:
                 }
                 correlated_threats.append(correlation)
         
-        return sorted(correlated_threats, key=lambda x: x["confidence"], reverse=True)
+        return sorted(correlated_threats, key=itemgetter("confidence"), reverse=True)
     
     async def predict_next_threats(self, historical_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -433,10 +521,11 @@ class ThreatAnalyzer:
         
         # Analyse des tendances (version simplifiée)
         threat_patterns = {}
+        now = datetime.utcnow()
         
         for incident in historical_data:
             threat_type = incident.get("type", "unknown")
-            timestamp = incident.get("timestamp", datetime.utcnow())
+            timestamp = incident.get("timestamp", now)
             
             # Groupement par mois
             month_key = timestamp.strftime("%Y-%m")
@@ -448,11 +537,13 @@ class ThreatAnalyzer:
         # Prédictions basiques (à améliorer avec des modèles de time series)
         predictions = []
         
-        current_month = datetime.utcnow().strftime("%Y-%m")
+        current_month = now.strftime("%Y-%m")
         
-        for threat_type in ["malware", "phishing", "ddos", "vulnerability"]:
+        # Fenêtre des 3 derniers mois, identique pour tous les types de menace
+        recent_months = sorted(threat_patterns)[-3:]
+        
+        for threat_type in ("malware", "phishing", "ddos", "vulnerability"):
             # Calcul de la tendance
-            recent_months = sorted(threat_patterns.keys())[-3:]  # 3 derniers mois
             trend = 0
             
             if len(recent_months) >= 2:
@@ -471,7 +562,7 @@ class ThreatAnalyzer:
                 
                 predictions.append(prediction)
         
-        return sorted(predictions, key=lambda x: x["predicted_incidents"], reverse=True)
+        return sorted(predictions, key=itemgetter("predicted_incidents"), reverse=True)
     
     async def generate_threat_report(self, indicators: List[str]) -> Dict[str, Any]:
         """Génération d'un rapport de menace complet"""
@@ -482,17 +573,20 @@ class ThreatAnalyzer:
         # Corrélation des menaces
         correlations = await self.correlate_threats()
         
+        # Horodatage unique pour l'ensemble du rapport
+        now = datetime.utcnow()
+        
         # Prédictions (basées sur des données simulées)
         sample_historical = [
-            {"type": "malware", "timestamp": datetime.utcnow() - timedelta(days=30)},
-            {"type": "phishing", "timestamp": datetime.utcnow() - timedelta(days=15)},
+            {"type": "malware", "timestamp": now - timedelta(days=30)},
+            {"type": "phishing", "timestamp": now - timedelta(days=15)},
         ]
         predictions = await self.predict_next_threats(sample_historical)
         
         # Compilation du rapport
         report = {
-            "report_id": hashlib.md5(str(datetime.utcnow()).encode()).hexdigest()[:8],
-            "generated_at": datetime.utcnow(),
+            "report_id": secrets.token_hex(4),
+            "generated_at": now,
             "summary": {
                 "total_indicators": len(indicators),
                 "threats_detected": len(analysis["threats_detected"]),
@@ -42,13 +42,11 @@ setup(
         "Topic :: Scientific/Engineering :: Artificial Intelligence",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.10",
     install_requires=requirements,
     extras_require={
         "dev": [
@@ -62,6 +60,12 @@ setup(
         "gpu": [
             "torch[cuda]>=2.1.0",
         ],
+        "performance": [
+            "hyperscan>=0.4.0",
+            "scikit-learn-intelex>=2023.2.0",
+            "pyahocorasick>=2.0.0",
+            "msgpack>=1.0.0",
+        ],
         "production": [
             "gunicorn>=21.2.0",
             "psycopg2-binary>=2.9.0",
@@ -78,6 +82,7 @@ setup(
     include_package_data=True,
     package_data={
         "": ["*.txt", "*.md", "*.yml", "*.yaml", "*.json"],
+        "api": ["static/*.html"],
     },
     keywords=[
         "cybersecurity", "artificial intelligence", "threat analysis", 